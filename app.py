@@ -1,5 +1,7 @@
 import json
+import mmap
 import os
+import shutil
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext, filedialog
 from datetime import datetime
@@ -7,9 +9,20 @@ from fpdf import FPDF
 import webbrowser
 import tkinter.font as tkFont
 import sys
+import time
 import logging
 from pathlib import Path
 from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+
+try:
+    import orjson  # быстрый JSON-парсер; если не установлен — используется стандартный json
+except ImportError:
+    orjson = None
 
 # ----------------- Настройка логирования -----------------
 logger = logging.getLogger("InventoryApp")
@@ -25,8 +38,9 @@ logger.addHandler(file_handler)
 logger.addHandler(console_handler)
 
 # ----------------- Вспомогательные функции -----------------
+@lru_cache(maxsize=8)
 def _get_asset_path(filename: str) -> str:
-    """Универсальный метод поиска asset-файлов (для шрифтов и т.п.)."""
+    """Универсальный метод поиска asset-файлов (для шрифтов и т.п.); найденный путь кэшируется."""
     if getattr(sys, 'frozen', False):
         base_path = Path(sys._MEIPASS)
     else:
@@ -40,14 +54,217 @@ def _get_asset_path(filename: str) -> str:
             return str(path)
     raise FileNotFoundError(f"Файл не найден: {filename} в путях: {[str(p) for p in candidates]}")
 
-def _safe_save_json(data: Any, filepath: Path) -> bool:
+def _json_loads(raw: bytes) -> Any:
+    """Разбирает JSON из байтов (orjson, если доступен)."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+# Компактный JSON (без отступов) заметно меньше по объёму — быстрее запись по сети. Используется
+# по умолчанию; файлы с отступами для ручного просмотра включаются в настройках
+_json_compact = True
+
+def _set_json_compact(compact: bool):
+    global _json_compact
+    _json_compact = compact
+
+def _json_dumps(data: Any, compact: Optional[bool] = None) -> bytes:
+    """Сериализует данные в JSON (UTF-8; с отступом 2 или компактно) в виде байтов."""
+    if compact is None:
+        compact = _json_compact
+    if orjson is not None:
+        return orjson.dumps(data) if compact else orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    if compact:
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+def _read_file_bytes(filepath: Path) -> Optional[bytes]:
+    """Читает файл целиком; None, если файла нет."""
+    try:
+        with open(filepath, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def _load_json_mapped(filepath: Path) -> Any:
+    """Читает JSON-файл через mmap, отдавая парсеру страницы файла без копирования в буфер."""
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return _json_loads(b'')  # пустой файл — та же ошибка разбора, что и при обычном чтении
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if orjson is not None:
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+            return json.loads(mm[:])
+
+# Поля с небольшим числом различных значений: одинаковые строки хранятся в одном экземпляре
+_SHARED_VALUE_FIELDS = ('equipment_type', 'model', 'assignment', 'date')
+
+def _share_repeated_values(data: List[Dict[str, Any]]):
+    """Интернирует повторяющиеся значения записей, чтобы тысячи копий одной строки не занимали память."""
+    intern = sys.intern
+    for item in data:
+        for field in _SHARED_VALUE_FIELDS:
+            value = item.get(field)
+            if type(value) is str:
+                item[field] = intern(value)
+
+# Горячие клавиши буфера обмена: коды клавиш Windows (не зависят от раскладки) и keysym для остальных ОС
+_CLIPBOARD_KEYCODES = {67: "<<Copy>>", 88: "<<Cut>>", 86: "<<Paste>>"}
+_CLIPBOARD_KEYSYMS = {'c': "<<Copy>>", 'x': "<<Cut>>", 'v': "<<Paste>>"}
+
+def _clear_tree(tree):
+    """Очищает Treeview одним вызовом Tcl вместо удаления строк по одной."""
+    children = tree.get_children()
+    if children:
+        tree.delete(*children)
+
+@lru_cache(maxsize=8192)
+def _comment_preview(comments: str) -> str:
+    """Сокращённый комментарий для отображения в таблицах (кэшируется по тексту)."""
+    return (comments[:50] + '...') if len(comments) > 50 else comments
+
+# Поля записи по номерам столбцов таблиц (для редактирования ячеек двойным щелчком)
+_INVENTORY_TREE_FIELDS = ('equipment_type', 'model', 'serial_number', 'assignment', 'date', 'comments')
+_EMPLOYEE_TREE_FIELDS = ('equipment_type', 'model', 'serial_number', 'date', 'comments')
+
+def _inventory_row(item: dict) -> tuple:
+    """Значения строки таблиц «Показать всё» и «Поиск» для записи инвентаря."""
+    return (
+        item.get('equipment_type', ''),
+        item.get('model', ''),
+        item.get('serial_number', ''),
+        item.get('assignment', ''),
+        item.get('date', ''),
+        _comment_preview(item.get('comments') or '')
+    )
+
+def _employee_row(item: dict) -> tuple:
+    """Значения строки таблицы «Оборудование сотрудника» (без столбца закрепления)."""
+    return (
+        item.get('equipment_type', ''),
+        item.get('model', ''),
+        item.get('serial_number', ''),
+        item.get('date', ''),
+        _comment_preview(item.get('comments') or '')
+    )
+
+def _search_fold(text: str) -> str:
+    """Приводит текст к виду для поиска без учёта регистра (casefold, «ё» = «е»)."""
+    return text.casefold().replace('ё', 'е')
+
+def _search_blob(item: dict) -> str:
+    """Строка для полнотекстового поиска: все непустые значения записи, приведённые через _search_fold."""
+    return _search_fold('\n'.join(str(value) for value in item.values() if value))
+
+# Tcl-процедура: вставка всех подготовленных строк в Treeview за один вызов интерпретатора
+_TREE_INSERT_SCRIPT = """{w rows} {
+    set ids {}
+    foreach values $rows {
+        lappend ids [$w insert {} end -values $values]
+    }
+    return $ids
+}"""
+
+def _insert_rows(tree, rows) -> tuple:
+    """Вставляет заранее подготовленные строки (кортежи значений) в Treeview одним обращением к Tcl; возвращает id строк."""
+    if not rows:
+        return ()
+    return tree.tk.splitlist(tree.tk.call('apply', _TREE_INSERT_SCRIPT, str(tree), rows))
+
+def _date_sort_key(value: str) -> tuple:
+    """Ключ сортировки для даты дд.мм.гггг без strptime; некорректные даты — в начало."""
+    parts = value.split('.')
+    if len(parts) == 3 and all(p.isdigit() for p in parts) and len(parts[2]) == 4:
+        day, month, year = map(int, parts)
+        if 1 <= day <= 31 and 1 <= month <= 12:
+            return year, month, day
+    return 0, 0, 0
+
+# Tcl-процедура: значения одного столбца всех строк Treeview за один вызов интерпретатора
+_TREE_COLUMN_SCRIPT = """{w col} {
+    set result {}
+    foreach k [$w children {}] {
+        lappend result [$w set $k $col] $k
+    }
+    return $result
+}"""
+
+def _tree_column_values(tree: ttk.Treeview, col: str) -> List[tuple]:
+    """Возвращает [(значение, iid), ...] для столбца col одним обращением к Tcl."""
+    flat = tree.tk.splitlist(tree.tk.call('apply', _TREE_COLUMN_SCRIPT, str(tree), col))
+    return list(zip(flat[0::2], flat[1::2]))
+
+# Tcl-процедура: значения всех строк Treeview за один вызов интерпретатора
+_TREE_ROWS_SCRIPT = """{w} {
+    set result {}
+    foreach k [$w children {}] {
+        lappend result [$w item $k -values]
+    }
+    return $result
+}"""
+
+def _tree_rows(tree: ttk.Treeview) -> List[tuple]:
+    """Возвращает значения всех строк Treeview (для экспорта) одним обращением к Tcl."""
+    splitlist = tree.tk.splitlist
+    return [splitlist(values) for values in splitlist(tree.tk.call('apply', _TREE_ROWS_SCRIPT, str(tree)))]
+
+def _write_json_file(payload: bytes, filepath: Path):
+    """Записывает готовый JSON через временный файл; ошибки пробрасываются вызывающему."""
+    temp_file = filepath.with_suffix(filepath.suffix + ".tmp")
+    try:
+        with open(temp_file, 'wb') as f:
+            f.write(payload)
+        _replace_file(temp_file, filepath)
+    except OSError:
+        # Недописанный временный файл не оставляем рядом с данными
+        temp_file.unlink(missing_ok=True)
+        raise
+    logger.info(f"Файл сохранён: {filepath}")
+
+def _replace_file(src: Path, dst: Path, attempts: int = 5):
+    """Атомарно заменяет dst на src; повторяет попытку, пока файл занят чтением в другой копии программы."""
+    for attempt in range(1, attempts + 1):
+        try:
+            src.replace(dst)
+            return
+        except PermissionError:
+            # Windows не даёт заменить файл, открытый другим процессом без FILE_SHARE_DELETE;
+            # чтение на общем ресурсе короткое, поэтому достаточно немного подождать
+            if attempt == attempts:
+                raise
+            time.sleep(0.05 * attempt)
+
+def _copy_file(src: Path, dst: Path, buffer_size: int = 1 << 20):
+    """Копирует файл блоками по 1 МБ (меньше обращений к сетевому диску) и сохраняет его метаданные."""
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        shutil.copyfileobj(fsrc, fdst, buffer_size)
+    shutil.copystat(src, dst)
+
+def _backup_files(files: List[Path], backup_dir: Path, timestamp: str, keep: int = 10) -> List[Path]:
+    """Копирует файлы данных в каталог бэкапов и удаляет старые копии сверх keep."""
+    backup_dir.mkdir(exist_ok=True)
+    backed_up = []
+    for src_file in files:
+        backup_name = src_file.name.replace(".json", f"_backup_{timestamp}.json")
+        dst_file = backup_dir / backup_name
+        try:
+            # Без предварительного exists(): на сетевом диске это лишний запрос к серверу
+            _copy_file(src_file, dst_file)
+        except FileNotFoundError:
+            logger.info(f"Файл для бэкапа не найден: {src_file}")
+            continue
+        backed_up.append(dst_file)
+    all_backups = sorted(backup_dir.glob("*.json"), key=os.path.getmtime, reverse=True)
+    for old_backup in all_backups[keep:]:
+        old_backup.unlink()
+        logger.info(f"Удалён старый бэкап: {old_backup}")
+    return backed_up
+
+def _safe_save_json(data: Any, filepath: Path, compact: Optional[bool] = None) -> bool:
     """Сохраняет данные в JSON с использованием временного файла."""
     try:
-        temp_file = filepath.with_suffix(filepath.suffix + ".tmp")
-        with open(temp_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        temp_file.replace(filepath)
-        logger.info(f"Файл сохранён: {filepath}")
+        _write_json_file(_json_dumps(data, compact), filepath)
         return True
     except Exception as e:
         messagebox.showerror("Ошибка", f"Не удалось сохранить файл {filepath.name}: {e}")
@@ -58,8 +275,7 @@ def _safe_save_json(data: Any, filepath: Path) -> bool:
 class PDFWithCyrillic(FPDF):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        font_path = _get_asset_path('ChakraPetch-Regular.ttf')
-        self.add_font('ChakraPetch', '', font_path, uni=True)
+        self.add_font('ChakraPetch', '', _get_asset_path('ChakraPetch-Regular.ttf'))
         self.alias_nb_pages()
 
     def footer(self):
@@ -67,6 +283,93 @@ class PDFWithCyrillic(FPDF):
         self.set_font('ChakraPetch', '', 10)
         self.cell(0, 10, f'Страница {self.page_no()} из {{nb}}', 0, 0, 'C')
 
+def _render_pdf_table(pdf: FPDF, columns: List[str], data_rows: List[List[Any]]):
+    """Выводит таблицу отчёта: ширина столбцов по самому длинному значению, затем заголовок и строки."""
+    pdf.set_font("ChakraPetch", '', 12)
+    # Ширина строки измеряется один раз на уникальное значение: типы, сотрудники и даты повторяются
+    width_cache = {}
+
+    def string_width(text: str) -> float:
+        width = width_cache.get(text)
+        if width is None:
+            width = width_cache[text] = pdf.get_string_width(text) + 6
+        return width
+
+    # Ячейки приводятся к строкам один раз; ширина считается по столбцам (zip(*rows)),
+    # причём только по различным значениям — без Python-цикла по каждой ячейке
+    text_rows = [[str(cell_text) for cell_text in row] for row in data_rows]
+    col_widths = [string_width(col) for col in columns]
+    for i, column_values in enumerate(zip(*text_rows)):
+        col_widths[i] = max(col_widths[i], max(map(string_width, set(column_values))))
+    pdf.set_font("ChakraPetch", '', 14)
+    for i, col in enumerate(columns):
+        pdf.cell(col_widths[i], 10, col, 1, new_x="RIGHT", new_y="TOP", align='C')
+    pdf.ln()
+    pdf.set_font("ChakraPetch", '', 12)
+    cell = pdf.cell
+    for row in text_rows:
+        for width, cell_text in zip(col_widths, row):
+            cell(width, 10, cell_text, 1, new_x="RIGHT", new_y="TOP")
+        pdf.ln()
+
+# Больше строк в одном PDF не выводится: fpdf держит весь документ в памяти до output()
+_PDF_ROWS_PER_FILE = 5000
+
+def _build_pdf_report(filename: str, title: str, columns: List[str], data_rows: List[List[Any]],
+                      subtitle: str = "", rows_per_file: int = _PDF_ROWS_PER_FILE) -> List[str]:
+    """Строит PDF-отчёт (без обращений к Tk — можно вызывать из потока); большой отчёт делится на части."""
+    if len(data_rows) <= rows_per_file:
+        _write_pdf_report(filename, title, columns, data_rows, subtitle)
+        return [filename]
+    base, ext = os.path.splitext(filename)
+    parts_total = -(-len(data_rows) // rows_per_file)
+    filenames = []
+    for part, start in enumerate(range(0, len(data_rows), rows_per_file), 1):
+        part_filename = f"{base}_part{part}{ext}"
+        # Каждая часть — отдельный документ, память предыдущего освобождается
+        _write_pdf_report(part_filename, f"{title} (часть {part} из {parts_total})", columns,
+                          data_rows[start:start + rows_per_file], subtitle)
+        filenames.append(part_filename)
+    return filenames
+
+def _write_pdf_report(filename: str, title: str, columns: List[str], data_rows: List[List[Any]],
+                      subtitle: str = ""):
+    """Записывает один PDF-документ с заголовком и таблицей."""
+    pdf = PDFWithCyrillic(orientation='L')
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    pdf.set_font("ChakraPetch", '', 18)
+    pdf.cell(0, 10, title, 0, 1, 'C')
+    if subtitle:
+        pdf.set_font("ChakraPetch", '', 12)
+        pdf.cell(0, 10, subtitle, 0, 1, 'C')
+    pdf.ln(10)
+    _render_pdf_table(pdf, columns, data_rows)
+    pdf.output(filename)
+
+def _write_excel_report(filename: str, rows: List[tuple], columns: List[str]):
+    """Записывает таблицу в xlsx с шириной столбцов по содержимому (без обращений к Tk — можно вызывать из потока)."""
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+    # Ширина столбцов считается одним проходом по готовым кортежам до записи —
+    # без повторного открытия, обхода всех ячеек и пересохранения книги
+    widths = [len(str(col)) for col in columns]
+    for row in rows:
+        for i, value in enumerate(row):
+            if value is not None:
+                length = len(str(value))
+                if length > widths[i]:
+                    widths[i] = length
+    # Книга в режиме write_only: строки пишутся потоком, без DataFrame и объектов ячеек в памяти
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    for i, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(i)].width = width + 2
+    ws.append(columns)
+    for row in rows:
+        ws.append(row)
+    wb.save(filename)
+
 # ----------------- Основной класс приложения -----------------
 class InventoryApp:
     def __init__(self, root: tk.Tk):
@@ -88,6 +391,7 @@ class InventoryApp:
 
         # === Настройки: загрузка или выбор каталога данных ===
         self.settings_file = Path(__file__).parent / "settings.json"
+        self.compact_json = True
         self.data_dir = self.load_settings()
         if not self.data_dir:
             self.data_dir = self.choose_data_directory_on_start()
@@ -104,24 +408,61 @@ class InventoryApp:
         self.employees_file = self.data_dir / "sotrudniki.json"
         self.data_dir.mkdir(exist_ok=True)
 
-        self.inventory_data = self.load_data()
-        self.equipment_types = self.load_equipment_types()
-        self.history_data = self.load_history()
-        self.employees_list = self.load_employees()
+        self._data_version = 0  # увеличивается при каждом изменении записей инвентаря
+        self._load_data_files()
+        self._saved_version = self._data_version  # версия записей, совпадающая с inventory.json
+        self._employees_sorted = None
 
         self.unsaved_changes = False
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
         # === Для редактирования записи ===
-        self.current_edit_index = None
+        self.current_edit_item = None
         self.edit_entries = {}
+        self._edit_pool = {'entry': None, 'combo': None, 'text': None}
+        self._edit_handlers = {}  # вид редактора -> (сохранить, отменить) для текущей правки
+        # === Отложенный поиск (чтобы не пересканировать данные на каждое нажатие) ===
+        self.search_delay = 150  # мс
+        self._search_job = None
+        self._employee_filter_job = None  # отложенный фильтр сотрудников по вводу
+        # === Объединённое обновление представлений после изменения записей ===
+        self._refresh_pending = set()  # {'all', 'employees', 'history'}
+        self._refresh_job = None
+        self._search_blobs = None  # [(строка для поиска в нижнем регистре, запись)], строится лениво
+        self._by_assignment = None  # {сотрудник: [записи]}, строится лениво
+        self._type_counts = None  # Counter по типам оборудования, строится лениво
+        self._serials_sorted = None  # {тип ('' — все): отсортированные серийные номера}, строится лениво
+        # === Порционное заполнение вкладки «Показать всё» ===
+        self.tree_fill_chunk = 300  # строк за один проход цикла событий
+        self._fill_job = None
+        self._fill_rows = []
+        self._fill_pos = 0
+        self._all_tree_version = None  # версия данных, по которой заполнена таблица «Показать всё»
+        self._all_tree_items = {}  # id строки «Показать всё» -> запись inventory_data
+        self._search_tree_items = {}  # то же для таблицы «Поиск»
+        self._employee_tree_items = {}  # то же для таблицы «Оборудование сотрудника»
+        # === Фоновые операции с файлами (один поток — записи и бэкапы идут строго по очереди) ===
+        self._io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inventory-io')
+        # Отчёты строятся в отдельном потоке: долгий экспорт не задерживает сохранение данных
+        self._export_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inventory-export')
+        self._pending_saves = []  # [(future, путь, колбэк при успехе)]
+        self._save_poll_job = None
+        # === Отложенное сохранение правок в ячейках (серия правок — одна запись файла) ===
+        self.save_delay = 500  # мс
+        self._save_job = None
+        # === Отложенная запись истории (несколько записей подряд — одна перезапись history.json) ===
+        self.history_save_delay = 2000  # мс
+        self._history_save_job = None
+        self._history_seen = None  # {серийный номер: {(сотрудник, дата)}}, строится лениво
+        self._full_history_stale = True  # таблица полной истории ещё не заполнена
+        self.bind_clipboard_events()
         self.create_widgets()
         self.update_window_title()
         self.auto_save_interval = 300000  # 5 минут
         self.schedule_auto_save()
 
         # Клавиатурные сокращения
-        self.root.bind('<Control-s>', lambda e: self.save_data() and self.mark_saved())
+        self.root.bind('<Control-s>', lambda e: self.save_data())
         self.root.bind('<Control-f>', lambda e: self.search_entry.focus_set())
         # self.root.bind('<Delete>', self.delete_selected_item)
 
@@ -137,36 +478,124 @@ class InventoryApp:
 
     def mark_saved(self):
         self.unsaved_changes = False
+        self._saved_version = self._data_version
         self.update_window_title()
 
     def on_closing(self):
+        # Дожидаемся уже начатых записей: флаг несохранённых изменений снимается только после них
+        self._flush_saves()
         if self.unsaved_changes:
             answer = messagebox.askyesnocancel(
                 "Несохранённые изменения",
                 "Есть несохранённые изменения. Сохранить перед выходом?"
             )
             if answer is True:
-                if self.save_data():
+                if self.save_data() and self._flush_saves():
                     self.root.destroy()
             elif answer is False:
+                self._flush_saves()
                 self.root.destroy()
-        else:
+        elif self._flush_saves():
             self.root.destroy()
 
-    def is_serial_number_unique(self, serial_number: str, exclude_index: Optional[int] = None) -> bool:
-        for i, item in enumerate(self.inventory_data):
-            if exclude_index is not None and i == exclude_index:
-                continue
-            if item.get('serial_number') == serial_number:
-                return False
-        return True
+    def _rebuild_indexes(self):
+        """Пересобирает индексы (серийный номер → запись, счётчик закреплений) после загрузки данных."""
+        # При повторе серийного номера в индексе остаётся первая запись (обход с конца)
+        self._by_serial = {item['serial_number']: item for item in reversed(self.inventory_data)
+                           if item.get('serial_number')}
+        self._assignment_counts = Counter(item['assignment'] for item in self.inventory_data if item.get('assignment'))
+        self._invalidate_search_index()
+
+    def _count_assignment(self, assignment: str, delta: int):
+        """Учитывает появление (+1) или исчезновение (-1) записи, закреплённой за сотрудником."""
+        if not assignment:
+            return
+        count = self._assignment_counts[assignment] + delta
+        if count > 0:
+            self._assignment_counts[assignment] = count
+        else:
+            del self._assignment_counts[assignment]
+
+    def _assigned_employees(self) -> List[str]:
+        """Сотрудники, за которыми закреплена хотя бы одна запись (без полного прохода по данным)."""
+        return sorted(self._assignment_counts)
+
+    def _invalidate_search_index(self):
+        """Сбрасывает поисковый индекс и индекс по сотрудникам после изменения данных (пересоберутся по запросу)."""
+        self._search_blobs = None
+        self._by_assignment = None
+        self._type_counts = None
+        self._serials_sorted = None
+        self._data_version += 1
+
+    def _get_search_blobs(self) -> List[tuple]:
+        if self._search_blobs is None:
+            self._search_blobs = [(_search_blob(item), item) for item in self.inventory_data]
+        return self._search_blobs
+
+    def _index_new_item(self, item: Dict[str, Any]):
+        """Добавляет новую запись в уже построенные индексы, не сбрасывая их."""
+        self._by_serial[item['serial_number']] = item
+        self._count_assignment(item.get('assignment', ''), 1)
+        if self._search_blobs is not None:
+            self._search_blobs.append((_search_blob(item), item))
+        if self._by_assignment is not None and item.get('assignment'):
+            self._by_assignment.setdefault(item['assignment'], []).append(item)
+        if self._type_counts is not None:
+            self._type_counts[item.get('equipment_type')] += 1
+        self._serials_sorted = None
+        self._data_version += 1
+
+    def _equipment_type_counts(self) -> Counter:
+        """Число записей по типам оборудования."""
+        if self._type_counts is None:
+            self._type_counts = Counter(item.get('equipment_type') for item in self.inventory_data)
+        return self._type_counts
+
+    def _sorted_serials(self, equipment_type: str = '') -> List[str]:
+        """Отсортированные серийные номера (все или одного типа); пересчитываются только после изменения данных."""
+        if self._serials_sorted is None:
+            self._serials_sorted = {}
+        serials = self._serials_sorted.get(equipment_type)
+        if serials is None:
+            items = self.inventory_data
+            if equipment_type:
+                items = (item for item in items if item.get('equipment_type') == equipment_type)
+            serials = sorted({s for s in (item.get('serial_number') for item in items) if s})
+            self._serials_sorted[equipment_type] = serials
+        return serials
+
+    def _items_by_assignment(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Записи, сгруппированные по сотрудникам (в порядке inventory_data)."""
+        if self._by_assignment is None:
+            index = {}
+            for item in self.inventory_data:
+                assignment = item.get('assignment')
+                if assignment:
+                    index.setdefault(assignment, []).append(item)
+            self._by_assignment = index
+        return self._by_assignment
+
+    def _reindex_serial(self, item: Dict[str, Any], old_serial: str):
+        """Обновляет индекс после смены серийного номера у записи."""
+        if self._by_serial.get(old_serial) is item:
+            del self._by_serial[old_serial]
+        if item.get('serial_number'):
+            self._by_serial[item['serial_number']] = item
+
+    def is_serial_number_unique(self, serial_number: str, exclude_item: Optional[Dict[str, Any]] = None) -> bool:
+        existing = self._by_serial.get(serial_number)
+        return existing is None or existing is exclude_item
 
     # =============== РАБОТА С НАСТРОЙКАМИ ===============
     def load_settings(self) -> Optional[Path]:
         try:
-            if self.settings_file.exists():
-                with open(self.settings_file, 'r', encoding='utf-8') as f:
-                    settings = json.load(f)
+            raw = _read_file_bytes(self.settings_file)
+            if raw is not None:
+                settings = _json_loads(raw)
+                if isinstance(settings, dict):
+                    self.compact_json = bool(settings.get("compact_json", True))
+                    _set_json_compact(self.compact_json)
                     data_dir = settings.get("data_directory")
                     if data_dir and Path(data_dir).is_dir():
                         return Path(data_dir)
@@ -175,12 +604,14 @@ class InventoryApp:
         return None
 
     def save_settings(self, data_dir: Path):
-        try:
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump({"data_directory": str(data_dir)}, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            messagebox.showerror("Ошибка", f"Не удалось сохранить настройки: {e}")
-            logger.error(f"Save settings: {e}")
+        # settings.json всегда с отступами — его удобно править вручную
+        _safe_save_json({"data_directory": str(data_dir), "compact_json": self.compact_json},
+                        self.settings_file, compact=False)
+
+    def toggle_compact_json(self):
+        self.compact_json = self.compact_json_var.get()
+        _set_json_compact(self.compact_json)
+        self.save_settings(self.data_dir)
 
     def choose_data_directory_on_start(self) -> Optional[Path]:
         messagebox.showinfo("Первый запуск", "Пожалуйста, выберите каталог для хранения данных инвентаризации.")
@@ -190,12 +621,13 @@ class InventoryApp:
     # =============== РАБОТА С ТИПАМИ ОБОРУДОВАНИЯ ===============
     def load_equipment_types(self) -> List[str]:
         try:
-            if self.equipment_types_file.exists():
-                with open(self.equipment_types_file, 'r', encoding='utf-8') as file:
-                    data = json.load(file)
-                    return data if isinstance(data, list) else []
+            raw = self._read_data_file(self.equipment_types_file)
+            if raw is not None:
+                data = _json_loads(raw)
+                # Список типов всегда хранится отсортированным — сортировать его при каждом показе не нужно
+                return sorted(data) if isinstance(data, list) else []
             else:
-                default_types = ["Монитор", "Сисблок", "МФУ", "Клавиатура", "Мышь", "Наушники"]
+                default_types = sorted(["Монитор", "Сисблок", "МФУ", "Клавиатура", "Мышь", "Наушники"])
                 self.save_equipment_types(default_types)
                 return default_types
         except Exception as e:
@@ -203,16 +635,36 @@ class InventoryApp:
             logger.error(f"Load equipment types: {e}")
             return []
 
+    def _load_data_files(self):
+        """Загружает все файлы каталога данных."""
+        # Небольшие файлы читаются в фоновых потоках, пока загружается inventory.json:
+        # задержки сетевого диска на четырёх файлах перекрываются
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            self._prefetched = {path: pool.submit(_read_file_bytes, path)
+                                for path in (self.equipment_types_file, self.history_file, self.employees_file)}
+            self.inventory_data = self.load_data()
+            self._rebuild_indexes()
+            self.equipment_types = self.load_equipment_types()
+            self.history_data = self.load_history()
+            self.employees_list = self.load_employees()
+
+    def _read_data_file(self, filepath: Path) -> Optional[bytes]:
+        """Содержимое файла данных: из предзагрузки при запуске или прямым чтением; None, если файла нет."""
+        future = self._prefetched.pop(filepath, None)
+        if future is not None:
+            return future.result()
+        return _read_file_bytes(filepath)
+
     def save_equipment_types(self, types_list: List[str]) -> bool:
         return _safe_save_json(types_list, self.equipment_types_file)
 
     # =============== РАБОТА СО СПИСКОМ СОТРУДНИКОВ ===============
     def load_employees(self) -> List[str]:
         try:
-            if self.employees_file.exists():
-                with open(self.employees_file, 'r', encoding='utf-8') as file:
-                    data = json.load(file)
-                    return data if isinstance(data, list) else []
+            raw = self._read_data_file(self.employees_file)
+            if raw is not None:
+                data = _json_loads(raw)
+                return data if isinstance(data, list) else []
             else:
                 self.save_employees([])
                 return []
@@ -222,8 +674,27 @@ class InventoryApp:
             return []
 
     def save_employees(self, employees_list: List[str]) -> bool:
+        self._employees_sorted = None
         return _safe_save_json(employees_list, self.employees_file)
 
+    def _sorted_employees(self) -> List[str]:
+        """Отсортированный список сотрудников; пересчитывается только после изменения списка."""
+        if self._employees_sorted is None:
+            self._employees_sorted = sorted(self.employees_list)
+            self._employee_choices_cache = ("",) + tuple(self._employees_sorted)
+            self._employee_choices_lower = tuple((emp.lower(), emp) for emp in self._employee_choices_cache)
+        return self._employees_sorted
+
+    def _employee_choices(self) -> tuple:
+        """Значения выпадающих списков сотрудников: пустой вариант и отсортированный список (общий кэш)."""
+        self._sorted_employees()
+        return self._employee_choices_cache
+
+    def _employee_choices_lowered(self) -> tuple:
+        """Те же значения парами (в нижнем регистре, как есть) — для фильтра по вводу без lower() на каждое нажатие."""
+        self._sorted_employees()
+        return self._employee_choices_lower
+
     def add_employee(self, employee_name: str) -> bool:
         if not employee_name.strip():
             return False
@@ -241,7 +712,8 @@ class InventoryApp:
     def delete_employee(self, employee_name: str) -> bool:
         if not employee_name:
             return False
-        in_use = any(item.get('assignment', '') == employee_name for item in self.inventory_data)
+        # Счётчик закреплений ведётся при каждой правке — полный проход по записям не нужен
+        in_use = self._assignment_counts.get(employee_name, 0) > 0
         if in_use:
             messagebox.showerror("Ошибка", f"Сотрудник '{employee_name}' используется в записях. Удаление запрещено.")
             return False
@@ -255,29 +727,27 @@ class InventoryApp:
 
     def update_employee_comboboxes(self):
         if hasattr(self, 'assignment_combo'):
-            self.assignment_combo['values'] = [""] + sorted(self.employees_list)
+            self.assignment_combo['values'] = self._employee_choices()
             if self.employees_list:
                 self.assignment_var.set(self.employees_list[0])
             else:
                 self.assignment_var.set('')
         if hasattr(self, 'employee_combo'):
-            self.employee_combo['values'] = [""] + sorted(self.employees_list)
+            self.employee_combo['values'] = self._employee_choices()
             if self.employees_list:
                 self.employee_var.set(self.employees_list[0])
             else:
                 self.employee_var.set('')
         if hasattr(self, 'history_employee_combo'):
-            self.history_employee_combo['values'] = [""] + sorted(set(
-                item.get('assignment', '') for item in self.inventory_data if item.get('assignment')
-            ))
+            self.history_employee_combo['values'] = [""] + self._assigned_employees()
 
     # =============== РАБОТА С ИСТОРИЕЙ ===============
     def load_history(self) -> Dict[str, List[Dict[str, str]]]:
         try:
-            if self.history_file.exists():
-                with open(self.history_file, 'r', encoding='utf-8') as file:
-                    data = json.load(file)
-                    return data if isinstance(data, dict) else {}
+            raw = self._read_data_file(self.history_file)
+            if raw is not None:
+                data = _json_loads(raw)
+                return data if isinstance(data, dict) else {}
             else:
                 return {}
         except Exception as e:
@@ -286,17 +756,42 @@ class InventoryApp:
             return {}
 
     def save_history(self) -> bool:
+        if self._history_save_job is not None:  # явное сохранение заменяет отложенное
+            self.root.after_cancel(self._history_save_job)
+            self._history_save_job = None
         return _safe_save_json(self.history_data, self.history_file)
 
+    def _schedule_history_save(self):
+        """Откладывает запись history.json, чтобы серия добавлений сохранилась одним файлом."""
+        if self._history_save_job is None:
+            self._history_save_job = self.root.after(self.history_save_delay, self._run_history_save)
+
+    def _run_history_save(self):
+        self._history_save_job = None
+        self.save_history()
+
+    def _flush_history_save(self):
+        """Записывает историю немедленно, если запись ещё ждёт своей очереди."""
+        if self._history_save_job is not None:
+            self.save_history()
+
+    def _history_keys(self) -> Dict[str, set]:
+        """Пары (сотрудник, дата) по серийным номерам — проверка дублей в истории без прохода по списку."""
+        if self._history_seen is None:
+            self._history_seen = {
+                serial: {(rec.get('assignment'), rec.get('date')) for rec in records}
+                for serial, records in self.history_data.items()
+            }
+        return self._history_seen
+
     def add_to_history(self, serial_number: str, assignment: str, date: str):
         if not serial_number or not assignment:
             return
-        if serial_number not in self.history_data:
-            self.history_data[serial_number] = []
-        entry = {"assignment": assignment, "date": date}
-        if entry not in self.history_data[serial_number]:
-            self.history_data[serial_number].append(entry)
-            self.save_history()
+        seen = self._history_keys().setdefault(serial_number, set())
+        if (assignment, date) not in seen:
+            seen.add((assignment, date))
+            self.history_data.setdefault(serial_number, []).append({"assignment": assignment, "date": date})
+            self._schedule_history_save()
 
     def get_history_for_equipment(self, serial_number: str) -> List[Dict[str, str]]:
         return self.history_data.get(serial_number, [])
@@ -307,17 +802,17 @@ class InventoryApp:
             messagebox.showinfo("Информация", "Нет данных в инвентаризации для инициализации истории.")
             return
         updated = False
+        history_keys = self._history_keys()
         for item in self.inventory_data:
             serial = item.get('serial_number')
             assignment = item.get('assignment')
             date = item.get('date')
             if not serial or not assignment or not date:
                 continue
-            if serial not in self.history_data:
-                self.history_data[serial] = []
-            existing = any(rec.get('assignment') == assignment and rec.get('date') == date for rec in self.history_data[serial])
-            if not existing:
-                self.history_data[serial].append({"assignment": assignment, "date": date})
+            seen = history_keys.setdefault(serial, set())
+            if (assignment, date) not in seen:
+                seen.add((assignment, date))
+                self.history_data.setdefault(serial, []).append({"assignment": assignment, "date": date})
                 updated = True
         if updated:
             if self.save_history():
@@ -331,78 +826,185 @@ class InventoryApp:
     # =============== ВСПОМОГАТЕЛЬНЫЙ МЕТОД ДЛЯ ПОЛУЧЕНИЯ МОДЕЛИ ===============
     def _get_model_by_serial(self, serial: str) -> str:
         """Вспомогательная функция: получает модель по серийному номеру."""
-        for item in self.inventory_data:
-            if item.get('serial_number') == serial:
-                return item.get('model', '-')
-        return "-"
+        item = self._by_serial.get(serial)
+        return item.get('model', '-') if item is not None else "-"
 
     # =============== ОСНОВНАЯ ЛОГИКА ===============
+    def _inventory_mtime(self) -> Optional[int]:
+        """Время изменения inventory.json (нс) или None, если файла нет."""
+        try:
+            return self.inventory_file.stat().st_mtime_ns
+        except OSError:
+            return None
+
     def load_data(self) -> List[Dict[str, Any]]:
+        self._loaded_mtime = None
         try:
-            if self.inventory_file.exists():
-                with open(self.inventory_file, 'r', encoding='utf-8') as file:
-                    data = json.load(file)
-                    if not isinstance(data, list):
-                        raise ValueError("Файл должен содержать массив объектов")
-                    return data
+            # stat() заодно показывает, есть ли файл, — отдельный exists() по сети не нужен
+            self._loaded_mtime = self._inventory_mtime()
+            if self._loaded_mtime is not None:
+                data = _load_json_mapped(self.inventory_file)
+                if not isinstance(data, list):
+                    raise ValueError("Файл должен содержать массив объектов")
+                _share_repeated_values(data)
+                return data
             else:
-                with open(self.inventory_file, 'w', encoding='utf-8') as file:
-                    json.dump([], file)
+                _safe_save_json([], self.inventory_file)
                 return []
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось загрузить данные: {e}")
             logger.error(f"Load inventory data: {e}")
             return []
 
-    def save_data(self) -> bool:
-        if _safe_save_json(self.inventory_data, self.inventory_file):
-            self.mark_saved()
-            return True
-        return False
+    def save_data(self, on_saved=None) -> bool:
+        """Ставит запись inventory.json в очередь; данные считаются сохранёнными только после успешной записи.
+
+        on_saved вызывается в UI-потоке, когда файл действительно записан.
+        """
+        # История по сохраняемым записям пишется вместе с ними, а не ждёт своего таймера:
+        # отложенной остаётся только история правок, сделанных после этого сохранения
+        self._flush_history_save()
+        version = self._data_version
+
+        def on_success():
+            self._on_inventory_saved(version)
+            if on_saved is not None:
+                self.root.after_idle(on_saved)
+
+        return self._save_json_async(self.inventory_data, self.inventory_file, on_success=on_success)
+
+    def _on_inventory_saved(self, version: int):
+        """Запись inventory.json завершилась: сохранённой считается версия, с которой снят снимок."""
+        self._loaded_mtime = self._inventory_mtime()
+        self._saved_version = version
+        if version == self._data_version and self._save_job is None:
+            self.unsaved_changes = False
+        self.update_window_title()
 
-    def create_backup(self):
+    def _inventory_save_pending(self) -> bool:
+        return any(filepath == self.inventory_file for _, filepath, _ in self._pending_saves)
+
+    def _save_json_async(self, data: Any, filepath: Path, on_success=None) -> bool:
+        """Снимок JSON готовится в UI-потоке, а запись на диск (SMB) уходит в фоновый поток."""
         try:
-            backup_dir = self.data_dir / "backups"
-            backup_dir.mkdir(exist_ok=True)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            files_to_backup = [
-                self.inventory_file,
-                self.history_file,
-                self.employees_file,
-                self.equipment_types_file
-            ]
-            backed_up = []
-            for src_file in files_to_backup:
-                if src_file.exists():
-                    backup_name = src_file.name.replace(".json", f"_backup_{timestamp}.json")
-                    dst_file = backup_dir / backup_name
-                    import shutil
-                    shutil.copy2(src_file, dst_file)
-                    backed_up.append(dst_file)
-                else:
-                    logger.info(f"Файл для бэкапа не найден: {src_file}")
-            all_backups = sorted(backup_dir.glob("*.json"), key=os.path.getmtime, reverse=True)
-            for old_backup in all_backups[10:]:
-                old_backup.unlink()
-                logger.info(f"Удалён старый бэкап: {old_backup}")
-            if backed_up:
-                self.status_var.set("Резервные копии созданы")
-                messagebox.showinfo("Успех", f"Резервные копии созданы:\n" + "\n".join(map(str, backed_up)))
-            else:
-                self.status_var.set("Нет файлов для резервного копирования")
-                messagebox.showwarning("Предупреждение", "Нет файлов для резервного копирования")
+            payload = _json_dumps(data)
         except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось сохранить файл {filepath.name}: {e}")
+            logger.error(f"Save {filepath}: {e}")
+            return False
+        future = self._io_executor.submit(_write_json_file, payload, filepath)
+        self._pending_saves.append((future, filepath, on_success))
+        if self._save_poll_job is None:
+            self._save_poll_job = self.root.after(50, self._poll_saves)
+        return True
+
+    def _poll_saves(self) -> bool:
+        """Разбирает завершённые фоновые записи; ошибки показываются в UI-потоке."""
+        self._save_poll_job = None
+        pending, self._pending_saves = self._pending_saves, []
+        running = []
+        ok = True
+        for future, filepath, on_success in pending:
+            if not future.done():
+                running.append((future, filepath, on_success))
+                continue
+            error = future.exception()
+            if error is None:
+                if on_success:
+                    on_success()
+                continue
+            ok = False
+            logger.error(f"Save {filepath}: {error}")
+            self.unsaved_changes = True
+            self.update_window_title()
+            messagebox.showerror("Ошибка", f"Не удалось сохранить файл {filepath.name}: {error}")
+        self._pending_saves = running + self._pending_saves
+        if self._pending_saves and self._save_poll_job is None:
+            self._save_poll_job = self.root.after(50, self._poll_saves)
+        return ok
+
+    def _schedule_save(self):
+        """Помечает данные изменёнными и откладывает запись, чтобы серия правок сохранилась один раз."""
+        self.unsaved_changes = True
+        self.update_window_title()
+        if self._save_job is not None:
+            self.root.after_cancel(self._save_job)
+        self._save_job = self.root.after(self.save_delay, self._run_scheduled_save)
+
+    def _run_scheduled_save(self):
+        self._save_job = None
+        self.save_data()
+
+    def _flush_scheduled_save(self):
+        """Выполняет отложенное сохранение немедленно, если оно ещё ждёт своей очереди."""
+        if self._save_job is not None:
+            self.root.after_cancel(self._save_job)
+            self._run_scheduled_save()
+
+    def _flush_saves(self) -> bool:
+        """Дожидается всех фоновых записей — перед перечитыванием файлов и при выходе."""
+        self._flush_scheduled_save()
+        self._flush_history_save()
+        if self._save_poll_job is not None:
+            self.root.after_cancel(self._save_poll_job)
+            self._save_poll_job = None
+        wait_futures([future for future, _, _ in self._pending_saves])
+        return self._poll_saves()
+
+    def create_backup(self):
+        files_to_backup = [
+            self.inventory_file,
+            self.history_file,
+            self.employees_file,
+            self.equipment_types_file
+        ]
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.status_var.set("Создание резервной копии...")
+        # Копирование по сети идёт в фоновом потоке — после уже поставленных в очередь сохранений
+        self._run_in_background(_backup_files, files_to_backup, self.data_dir / "backups", timestamp,
+                                on_done=self._on_backup_done)
+
+    def _on_backup_done(self, backed_up: Optional[List[Path]], error: Optional[BaseException]):
+        if error is not None:
             self.status_var.set("Ошибка при создании резервной копии")
-            messagebox.showerror("Ошибка", f"Не удалось создать резервную копию: {e}")
-            logger.error(f"Create backup: {e}")
+            messagebox.showerror("Ошибка", f"Не удалось создать резервную копию: {error}")
+            logger.error(f"Create backup: {error}")
+        elif backed_up:
+            self.status_var.set("Резервные копии созданы")
+            messagebox.showinfo("Успех", f"Резервные копии созданы:\n" + "\n".join(map(str, backed_up)))
+        else:
+            self.status_var.set("Нет файлов для резервного копирования")
+            messagebox.showwarning("Предупреждение", "Нет файлов для резервного копирования")
+
+    def _run_in_background(self, func, *args, on_done=None, executor: Optional[ThreadPoolExecutor] = None):
+        """Выполняет func в фоновом потоке (по умолчанию — в очереди записи файлов); on_done(результат, ошибка) — в UI-потоке."""
+        future = (executor or self._io_executor).submit(func, *args)
+
+        def check():
+            if not future.done():
+                self.root.after(50, check)
+            elif on_done is not None:
+                error = future.exception()
+                on_done(None if error is not None else future.result(), error)
+
+        self.root.after(50, check)
+        return future
+
+    def bind_clipboard_events(self):
+        """Ctrl+C/X/V для всех полей ввода: одна привязка на класс виджетов вместо привязки к каждому."""
+        def on_control_key(event):
+            # В Windows распознаём по коду клавиши — так сочетания работают и в русской раскладке
+            if sys.platform == 'win32':
+                virtual = _CLIPBOARD_KEYCODES.get(event.keycode)
+            else:
+                virtual = _CLIPBOARD_KEYSYMS.get(event.keysym.lower())
+            if virtual is None:
+                return None
+            event.widget.event_generate(virtual)
+            return "break"
 
-    def bind_clipboard_events(self, widget):
-        def do_copy(event): widget.event_generate("<<Copy>>"); return "break"
-        def do_cut(event): widget.event_generate("<<Cut>>"); return "break"
-        def do_paste(event): widget.event_generate("<<Paste>>"); return "break"
-        widget.bind("<Control-c>", do_copy)
-        widget.bind("<Control-x>", do_cut)
-        widget.bind("<Control-v>", do_paste)
+        for widget_class in ('TEntry', 'TCombobox', 'Text'):
+            self.root.bind_class(widget_class, '<Control-KeyPress>', on_control_key, add='+')
 
     def create_widgets(self):
         main_frame = ttk.Frame(self.root)
@@ -475,11 +1077,12 @@ class InventoryApp:
         self.create_transfers_tab()
 
         self.notebook.select(self.show_all_frame)
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
 
     # =============== ВКЛАДКА: ПОКАЗАТЬ ВСЁ ===============
     def create_show_all_tab(self):
         refresh_button = ttk.Button(self.show_all_frame, text="Обновить данные",
-                                    command=self.show_all_data, style='Small.TButton')
+                                    command=self.reload_data, style='Small.TButton')
         refresh_button.pack(pady=5)
 
         table_frame = ttk.Frame(self.show_all_frame)
@@ -526,12 +1129,12 @@ class InventoryApp:
             label.grid(row=i, column=0, sticky='w', padx=5, pady=3)
             if field_name == "equipment_type":
                 var = tk.StringVar()
-                combo = ttk.Combobox(edit_frame, textvariable=var, values=sorted(self.equipment_types), width=30)
+                combo = ttk.Combobox(edit_frame, textvariable=var, values=self.equipment_types, width=30)
                 combo.grid(row=i, column=1, padx=5, pady=3, sticky='we')
                 self.edit_entries[field_name] = (var, combo)
             elif field_name == "assignment":
                 var = tk.StringVar()
-                combo = ttk.Combobox(edit_frame, textvariable=var, values=[""] + sorted(self.employees_list), width=30)
+                combo = ttk.Combobox(edit_frame, textvariable=var, values=self._employee_choices(), width=30)
                 combo.grid(row=i, column=1, padx=5, pady=3, sticky='we')
                 self.edit_entries[field_name] = (var, combo)
             elif field_name == "comments":
@@ -561,12 +1164,11 @@ class InventoryApp:
             return
         values = self.all_tree.item(selected[0], 'values')
         serial = values[2]
-        idx = next((i for i, item in enumerate(self.inventory_data) if item.get('serial_number') == serial), None)
-        if idx is None:
+        item = self._by_serial.get(serial)
+        if item is None:
             messagebox.showerror("Ошибка", "Запись не найдена в данных")
             return
-        item = self.inventory_data[idx]
-        self.current_edit_index = idx
+        self.current_edit_item = item
         self.edit_entries['equipment_type'][0].set(item.get('equipment_type', ''))
         self.edit_entries['model'].delete(0, tk.END)
         self.edit_entries['model'].insert(0, item.get('model', ''))
@@ -580,10 +1182,10 @@ class InventoryApp:
             self.edit_entries['comments'].insert('1.0', item.get('comments', ''))
 
     def save_edited_item(self):
-        if self.current_edit_index is None:
+        if self.current_edit_item is None:
             return
 
-        item = self.inventory_data[self.current_edit_index]
+        item = self.current_edit_item
         new_data = {}
         new_data['equipment_type'] = self.edit_entries['equipment_type'][0].get().strip()
         new_data['model'] = self.edit_entries['model'].get().strip()
@@ -600,7 +1202,7 @@ class InventoryApp:
             messagebox.showwarning("Ошибка", "Недопустимый тип оборудования")
             return
 
-        if not self.is_serial_number_unique(new_data['serial_number'], exclude_index=self.current_edit_index):
+        if not self.is_serial_number_unique(new_data['serial_number'], exclude_item=item):
             messagebox.showerror("Ошибка", f"Серийный номер '{new_data['serial_number']}' уже существует!")
             return
 
@@ -611,20 +1213,24 @@ class InventoryApp:
             return
 
         old_assignment = item.get('assignment', '')
+        old_serial = item.get('serial_number', '')
         item.update(new_data)
+        if old_assignment != new_data['assignment']:
+            self._count_assignment(old_assignment, -1)
+            self._count_assignment(new_data['assignment'], 1)
+        self._invalidate_search_index()
+        if old_serial != new_data['serial_number']:
+            self._reindex_serial(item, old_serial)
 
         if old_assignment != new_data['assignment'] and new_data['assignment']:
             self.add_to_history(new_data['serial_number'], new_data['assignment'], new_data['date'])
 
         # ИСПРАВЛЕНИЕ: НЕ ВЫЗЫВАЕМ show_all_data(), чтобы не перезагружать из файла!
         # Вместо этого обновим дерево вручную или просто сохраним
-        if self.save_data():
-            messagebox.showinfo("Успех", "Запись обновлена")
+        if self.save_data(on_saved=lambda: messagebox.showinfo("Успех", "Запись обновлена")):
             self.cancel_edit()
             # Обновим интерфейс без перезагрузки из файла
-            self.refresh_employee_list()
-            self.update_history_combobox()
-            self.update_serial_combobox()
+            self._schedule_refresh('employees', 'history')
             # Обновим строку в таблице вручную (опционально, но для точности)
             selected = self.all_tree.selection()
             if selected:
@@ -634,11 +1240,11 @@ class InventoryApp:
                     new_data['serial_number'],
                     new_data['assignment'],
                     new_data['date'],
-                    (new_data['comments'][:50] + '...') if len(new_data['comments']) > 50 else new_data['comments']
+                    _comment_preview(new_data['comments'])
                 ))
 
     def cancel_edit(self):
-        self.current_edit_index = None
+        self.current_edit_item = None
         for field, widget in self.edit_entries.items():
             if field in ('equipment_type', 'assignment'):
                 widget[0].set('')
@@ -653,14 +1259,13 @@ class InventoryApp:
                                                                                  pady=5)
         self.search_entry = ttk.Entry(self.search_frame, width=40, font=self.default_font)
         self.search_entry.grid(row=0, column=1, padx=10, pady=5, sticky='we')
-        self.bind_clipboard_events(self.search_entry)
         self.search_entry.bind('<KeyRelease>', self.perform_search)
 
         ttk.Label(self.search_frame, text="Сотрудник:", font=self.default_font).grid(row=0, column=2, sticky='w',
                                                                                      padx=(20, 10), pady=5)
         self.search_employee_var = tk.StringVar()
         self.search_employee_combo = ttk.Combobox(self.search_frame, textvariable=self.search_employee_var,
-                                                  values=[""] + sorted(self.employees_list), width=25,
+                                                  values=self._employee_choices(), width=25,
                                                   font=self.default_font)
         self.search_employee_combo.grid(row=0, column=3, padx=10, pady=5, sticky='we')
         self.search_employee_combo.bind('<<ComboboxSelected>>', self.perform_search)
@@ -706,9 +1311,8 @@ class InventoryApp:
                                                                                                  pady=5)
         self.employee_var = tk.StringVar()
         self.employee_combo = ttk.Combobox(self.employee_frame, textvariable=self.employee_var,
-                                           values=[""] + sorted(self.employees_list), width=50, font=self.default_font)
+                                           values=self._employee_choices(), width=50, font=self.default_font)
         self.employee_combo.grid(row=0, column=1, columnspan=3, padx=10, pady=5, sticky='we')
-        self.bind_clipboard_events(self.employee_combo)
         self.employee_combo.bind('<<ComboboxSelected>>', self.show_employee_equipment)
 
         ttk.Label(self.employee_frame, text="Поиск сотрудника:", font=self.default_font).grid(row=1, column=0,
@@ -832,10 +1436,15 @@ class InventoryApp:
             for item in self.inventory_data:
                 if item.get('assignment') == old_name:
                     item['assignment'] = new_name
+            moved = self._assignment_counts.pop(old_name, 0)
+            if moved:
+                self._assignment_counts[new_name] += moved
+            self._invalidate_search_index()
             for serial, records in self.history_data.items():
                 for rec in records:
                     if rec.get('assignment') == old_name:
                         rec['assignment'] = new_name
+            self._history_seen = None
             self.save_employees(self.employees_list)
             self.save_data()
             self.save_history()
@@ -856,7 +1465,8 @@ class InventoryApp:
         employee_name = self.all_employees_listbox.get(selection[0])
         if not employee_name:
             return
-        in_use = any(item.get('assignment', '') == employee_name for item in self.inventory_data)
+        # Счётчик закреплений ведётся при каждой правке — полный проход по записям не нужен
+        in_use = self._assignment_counts.get(employee_name, 0) > 0
         if in_use:
             messagebox.showerror("Ошибка", f"Сотрудник '{employee_name}' используется в записях. Удаление запрещено.")
             return
@@ -867,37 +1477,15 @@ class InventoryApp:
             self.update_window_title()
             self.update_employee_comboboxes()
 
-    def export_employees_to_excel(self):
-        if not self.employees_list:
-            messagebox.showwarning("Предупреждение", "Список сотрудников пуст")
-            return
-        try:
-            import pandas as pd
-            df = pd.DataFrame(sorted(self.employees_list), columns=["Сотрудник"])
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".xlsx",
-                filetypes=[("Excel files", "*.xlsx")],
-                title="Сохранить список сотрудников",
-                initialdir=self.data_dir
-            )
-            if not filename:
-                return
-            df.to_excel(filename, index=False, engine='openpyxl')
-            from openpyxl import load_workbook
-            wb = load_workbook(filename)
-            ws = wb.active
-            ws.column_dimensions['A'].width = 30
-            wb.save(filename)
-            webbrowser.open(filename)
-            messagebox.showinfo("Успех", f"Список сотрудников сохранён:\n{filename}")
-        except ImportError:
-            messagebox.showerror("Ошибка", "Установите openpyxl: pip install openpyxl")
-        except Exception as e:
-            messagebox.showerror("Ошибка", f"Не удалось экспортировать:\n{e}")
-
     def filter_employees_by_search(self, event=None):
+        if self._employee_filter_job is not None:
+            self.root.after_cancel(self._employee_filter_job)
+        self._employee_filter_job = self.root.after(self.search_delay, self._filter_employees_now)
+
+    def _filter_employees_now(self):
+        self._employee_filter_job = None
         search_term = self.employee_search_var.get().lower().strip()
-        filtered_employees = [emp for emp in [""] + sorted(self.employees_list) if search_term in emp.lower()]
+        filtered_employees = [emp for lowered, emp in self._employee_choices_lowered() if search_term in lowered]
         self.employee_combo['values'] = filtered_employees
         if filtered_employees:
             self.employee_combo.current(0)
@@ -909,19 +1497,14 @@ class InventoryApp:
         if not self.inventory_data:
             messagebox.showwarning("Предупреждение", "Нет данных в базе инвентаризации.")
             return
-        new_employees = set()
-        for item in self.inventory_data:
-            assignment = item.get('assignment', '').strip()
-            if assignment:
-                new_employees.add(assignment)
+        new_employees = {name.strip() for name in self._assignment_counts if name.strip()}
         if not new_employees:
             messagebox.showinfo("Информация", "В базе нет записей с закреплёнными сотрудниками.")
             return
-        added_count = 0
-        for emp in new_employees:
-            if emp not in self.employees_list:
-                self.employees_list.append(emp)
-                added_count += 1
+        # Разность множеств вместо проверки «нет ли в списке» для каждого имени
+        added = sorted(new_employees.difference(self.employees_list))
+        self.employees_list.extend(added)
+        added_count = len(added)
         if self.save_employees(self.employees_list):
             self.unsaved_changes = True
             self.update_window_title()
@@ -934,7 +1517,7 @@ class InventoryApp:
     def refresh_employee_list(self):
         self.update_employee_comboboxes()
         self.all_employees_listbox.delete(0, tk.END)
-        for emp in sorted(self.employees_list):
+        for emp in self._sorted_employees():
             self.all_employees_listbox.insert(tk.END, emp)
 
     # =============== ФУНКЦИЯ ПЕРЕДАЧИ ОБОРУДОВАНИЯ ===============
@@ -949,7 +1532,7 @@ class InventoryApp:
             return
         item_values = tree.item(selected_items[0], 'values')
         serial_number = item_values[2]
-        target_item = next((item for item in self.inventory_data if item.get('serial_number') == serial_number), None)
+        target_item = self._by_serial.get(serial_number)
         if not target_item:
             messagebox.showerror("Ошибка", "Запись не найдена в базе")
             return
@@ -986,7 +1569,7 @@ class InventoryApp:
         ttk.Label(transfer_frame, text="Сотрудник:", font=large_font).pack(anchor='w', pady=(0, 10))
         new_employee_var = tk.StringVar()
         employee_combo = ttk.Combobox(transfer_frame, textvariable=new_employee_var,
-                                      values=sorted(self.employees_list), state='readonly', font=large_font)
+                                      values=self._sorted_employees(), state='readonly', font=large_font)
         employee_combo.pack(fill='x', pady=(0, 15))
         if self.employees_list:
             employee_combo.set(self.employees_list[0])
@@ -1013,15 +1596,15 @@ class InventoryApp:
 
             old_assignment = equipment_item.get('assignment', '')
             equipment_item['assignment'] = new_employee
+            self._count_assignment(old_assignment, -1)
+            self._count_assignment(new_employee, 1)
             equipment_item['date'] = transfer_date
+            self._invalidate_search_index()
             self.add_to_history(equipment_item['serial_number'], new_employee, transfer_date)
-            self.save_data()
-            self.save_history()
-            self.show_all_data()
-            self.refresh_employee_list()
-            self.update_serial_combobox()
-            self.update_history_combobox()
-            messagebox.showinfo("Успех", f"Оборудование передано сотруднику {new_employee}", parent=dialog)
+            # save_data записывает и историю; сообщение — после того, как файл действительно записан
+            self.save_data(on_saved=lambda: messagebox.showinfo(
+                "Успех", f"Оборудование передано сотруднику {new_employee}"))
+            self._schedule_refresh('all')
             dialog.destroy()
 
         btn_frame = ttk.Frame(dialog)
@@ -1049,33 +1632,28 @@ class InventoryApp:
             if field_name == "equipment_type":
                 self.equipment_type_var = tk.StringVar()
                 combo = ttk.Combobox(self.add_frame, textvariable=self.equipment_type_var,
-                                     values=sorted(self.equipment_types), width=38, font=self.default_font)
+                                     values=self.equipment_types, width=38, font=self.default_font)
                 combo.grid(row=i, column=1, padx=10, pady=5, sticky='we')
-                self.bind_clipboard_events(combo)
                 self.entries[field_name] = combo
             elif field_name == "comments":
                 entry = scrolledtext.ScrolledText(self.add_frame, width=40, height=4, font=self.default_font)
                 entry.grid(row=i, column=1, padx=10, pady=5, sticky='we')
-                self.bind_clipboard_events(entry)
                 self.entries[field_name] = entry
             elif field_name == "date":
                 entry = ttk.Entry(self.add_frame, width=40, font=self.default_font)
                 entry.insert(0, datetime.now().strftime("%d.%m.%Y"))
                 entry.grid(row=i, column=1, padx=10, pady=5, sticky='we')
-                self.bind_clipboard_events(entry)
                 self.entries[field_name] = entry
             elif field_name == "assignment":
                 self.assignment_var = tk.StringVar()
                 self.assignment_combo = ttk.Combobox(self.add_frame, textvariable=self.assignment_var,
-                                                     values=[""] + sorted(self.employees_list), width=38,
+                                                     values=self._employee_choices(), width=38,
                                                      font=self.default_font)
                 self.assignment_combo.grid(row=i, column=1, padx=10, pady=5, sticky='we')
-                self.bind_clipboard_events(self.assignment_combo)
                 self.entries[field_name] = self.assignment_combo
             else:
                 entry = ttk.Entry(self.add_frame, width=40, font=self.default_font)
                 entry.grid(row=i, column=1, padx=10, pady=5, sticky='we')
-                self.bind_clipboard_events(entry)
                 self.entries[field_name] = entry
 
         add_button = ttk.Button(self.add_frame, text="Добавить оборудование",
@@ -1119,7 +1697,6 @@ class InventoryApp:
                                                                                 pady=5)
         self.equipment_type_entry = ttk.Entry(frame, width=40, font=self.default_font)
         self.equipment_type_entry.grid(row=0, column=1, padx=10, pady=5, sticky='we')
-        self.bind_clipboard_events(self.equipment_type_entry)
 
         add_btn = ttk.Button(frame, text="➕ Добавить тип", command=self.add_equipment_type, style='Small.TButton')
         add_btn.grid(row=0, column=2, padx=10, pady=5)
@@ -1144,10 +1721,8 @@ class InventoryApp:
         self.refresh_equipment_list()
 
     def refresh_equipment_list(self):
-        for item in self.equipment_tree.get_children():
-            self.equipment_tree.delete(item)
-        for eq_type in sorted(self.equipment_types):
-            self.equipment_tree.insert("", "end", values=(eq_type,))
+        _clear_tree(self.equipment_tree)
+        _insert_rows(self.equipment_tree, [(eq_type,) for eq_type in self.equipment_types])
 
     def add_equipment_type(self):
         new_type = self.equipment_type_entry.get().strip()
@@ -1157,7 +1732,7 @@ class InventoryApp:
         if new_type in self.equipment_types:
             messagebox.showwarning("Предупреждение", "Такой тип уже существует")
             return
-        self.equipment_types.append(new_type)
+        insort(self.equipment_types, new_type)
         if self.save_equipment_types(self.equipment_types):
             messagebox.showinfo("Успех", "Тип оборудования добавлен")
             self.equipment_type_entry.delete(0, tk.END)
@@ -1177,9 +1752,10 @@ class InventoryApp:
             messagebox.showwarning("Предупреждение", "Выберите тип для удаления")
             return
         selected_type = self.equipment_tree.item(selected_items[0], 'values')[0]
-        in_use = any(item.get('equipment_type') == selected_type for item in self.inventory_data)
+        in_use = self._equipment_type_counts().get(selected_type, 0)
         if in_use:
-            messagebox.showerror("Ошибка", f"Тип '{selected_type}' используется в записях. Удаление запрещено.")
+            messagebox.showerror("Ошибка",
+                                 f"Тип '{selected_type}' используется в {in_use} записях. Удаление запрещено.")
             return
         if messagebox.askyesno("Подтверждение", f"Вы уверены, что хотите удалить тип '{selected_type}'?"):
             self.equipment_types.remove(selected_type)
@@ -1202,10 +1778,16 @@ class InventoryApp:
         ttk.Label(frame, text="⚠️ Все файлы (inventory.json, history.json и др.) хранятся в этом каталоге",
                   font=self.default_font, foreground="red").pack(pady=10)
 
+        self.compact_json_var = tk.BooleanVar(value=self.compact_json)
+        ttk.Checkbutton(frame, text="Сохранять JSON компактно (без отступов — файлы меньше, запись по сети быстрее)",
+                        variable=self.compact_json_var, command=self.toggle_compact_json).pack(pady=10)
+
     def choose_data_directory(self):
         directory = filedialog.askdirectory(title="Выберите каталог для хранения данных")
         if not directory:
             return
+        if not self._flush_saves():
+            return
         self.data_dir = Path(directory)
         self.save_settings(self.data_dir)
         self.current_path_label.config(text=str(self.data_dir))
@@ -1213,14 +1795,11 @@ class InventoryApp:
         self.history_file = self.data_dir / "history.json"
         self.employees_file = self.data_dir / "sotrudniki.json"
         self.equipment_types_file = self.data_dir / "equipment_types.json"
-        self.inventory_data = self.load_data()
-        self.history_data = self.load_history()
-        self.employees_list = self.load_employees()
-        self.equipment_types = self.load_equipment_types()
+        self._load_data_files()
+        self.mark_saved()  # данные только что прочитаны из нового каталога — сохранять нечего
+        self._history_seen = None
+        self._employees_sorted = None
         self.show_all_data()
-        self.refresh_employee_list()
-        self.update_history_combobox()
-        self.update_serial_combobox()
         messagebox.showinfo("Успех", f"Каталог данных изменён:\n{self.data_dir}")
 
     def create_history_tab(self):
@@ -1235,8 +1814,7 @@ class InventoryApp:
         self.history_employee_combo = ttk.Combobox(
             filter_frame,
             textvariable=self.history_employee_var,
-            values=[""] + sorted(
-                set(item.get('assignment', '') for item in self.inventory_data if item.get('assignment'))),
+            values=[""] + self._assigned_employees(),
             width=20,
             font=self.default_font
         )
@@ -1249,8 +1827,7 @@ class InventoryApp:
         self.history_type_combo = ttk.Combobox(
             filter_frame,
             textvariable=self.history_type_var,
-            values=[""] + sorted(
-                set(item.get('equipment_type', '') for item in self.inventory_data if item.get('equipment_type'))),
+            values=[""] + sorted(t for t in self._equipment_type_counts() if t),
             width=20,
             font=self.default_font
         )
@@ -1352,45 +1929,41 @@ class InventoryApp:
 
     def filter_history_by_employee(self, event=None):
         employee = self.history_employee_var.get().strip()
-        for item in self.history_tree.get_children():
-            self.history_tree.delete(item)
+        _clear_tree(self.history_tree)
         if not employee:
             return
+        rows = []
         for serial, records in self.history_data.items():
-            eq_type = "-"
-            model = self._get_model_by_serial(serial)
-            for inv_item in self.inventory_data:
-                if inv_item.get('serial_number') == serial:
-                    eq_type = inv_item.get('equipment_type', '-')
-                    break
-            for record in records:
-                if record.get("assignment") == employee:
-                    self.history_tree.insert("", "end", values=(
-                        eq_type,
-                        model,
-                        serial,
-                        record["assignment"],
-                        record["date"]
-                    ))
+            matched = [record for record in records if record.get("assignment") == employee]
+            if not matched:
+                continue
+            eq_type, model = self._type_and_model(serial)
+            rows.extend((eq_type, model, serial, record["assignment"], record["date"]) for record in matched)
+        _insert_rows(self.history_tree, rows)
+
+    def on_tab_changed(self, event=None):
+        if self._full_history_stale and self.notebook.select() == str(self.history_frame):
+            self.show_full_history()
 
     def show_full_history(self):
-        for item in self.full_history_tree.get_children():
-            self.full_history_tree.delete(item)
+        # Полная история заполняется только на открытой вкладке; иначе — при первом переходе на неё
+        if self.notebook.select() != str(self.history_frame):
+            self._full_history_stale = True
+            return
+        self._full_history_stale = False
+        _clear_tree(self.full_history_tree)
+        rows = []
         for serial, records in self.history_data.items():
-            eq_type = "-"
-            model = self._get_model_by_serial(serial)
-            for inv_item in self.inventory_data:
-                if inv_item.get('serial_number') == serial:
-                    eq_type = inv_item.get('equipment_type', '-')
-                    break
-            for record in records:
-                self.full_history_tree.insert("", "end", values=(
-                    eq_type,
-                    model,
-                    serial,
-                    record["assignment"],
-                    record["date"]
-                ))
+            eq_type, model = self._type_and_model(serial)
+            rows.extend((eq_type, model, serial, record["assignment"], record["date"]) for record in records)
+        _insert_rows(self.full_history_tree, rows)
+
+    def _type_and_model(self, serial: str) -> tuple:
+        """Тип и модель оборудования по серийному номеру («-», если такой записи нет)."""
+        item = self._by_serial.get(serial)
+        if item is None:
+            return "-", "-"
+        return item.get('equipment_type', '-'), item.get('model', '-')
 
     def show_full_history_context_menu(self, event):
         item = self.full_history_tree.identify_row(event.y)
@@ -1416,19 +1989,13 @@ class InventoryApp:
             ]
             if not self.history_data[serial]:
                 del self.history_data[serial]
+            self._history_seen = None
             self.save_history()
             self.show_full_history()
             messagebox.showinfo("Успех", "Запись удалена из истории")
 
     def get_filtered_serial_numbers(self):
-        selected_type = self.history_type_var.get()
-        if not selected_type:
-            serials = sorted(
-                set(item.get('serial_number', '') for item in self.inventory_data if item.get('serial_number')))
-        else:
-            serials = sorted(set(item.get('serial_number', '') for item in self.inventory_data
-                                 if item.get('equipment_type') == selected_type and item.get('serial_number')))
-        return serials
+        return self._sorted_serials(self.history_type_var.get())
 
     def update_serial_combobox(self, event=None):
         serials = self.get_filtered_serial_numbers()
@@ -1442,62 +2009,45 @@ class InventoryApp:
     def show_history_for_equipment(self, event=None):
         serial = self.history_serial_combo_var.get().strip()
         if not serial:
-            for item in self.history_tree.get_children():
-                self.history_tree.delete(item)
+            _clear_tree(self.history_tree)
             return
-        eq_type = "-"
-        model = self._get_model_by_serial(serial)
-        for item in self.inventory_data:
-            if item.get('serial_number') == serial:
-                eq_type = item.get('equipment_type', '-')
-                break
+        eq_type, model = self._type_and_model(serial)
         history_list = self.get_history_for_equipment(serial)
-        for item in self.history_tree.get_children():
-            self.history_tree.delete(item)
-        for record in history_list:
-            self.history_tree.insert("", "end", values=(
-                eq_type,
-                model,
-                serial,
-                record["assignment"],
-                record["date"]
-            ))
+        _clear_tree(self.history_tree)
+        _insert_rows(self.history_tree,
+                     [(eq_type, model, serial, record["assignment"], record["date"]) for record in history_list])
 
     # =============== ЭКСПОРТ В EXCEL (общая функция) ===============
-    def _export_to_excel(self, rows: List[Dict[str, Any]], filename_title: str, initial_dir: Path):
+    def _export_to_excel(self, rows: List[tuple], columns: List[str], filename_title: str, initial_dir: Path):
         try:
-            import pandas as pd
-            df = pd.DataFrame(rows)
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".xlsx",
-                filetypes=[("Excel files", "*.xlsx")],
-                title=filename_title,
-                initialdir=initial_dir
-            )
-            if not filename:
-                return
-            df.to_excel(filename, index=False, engine='openpyxl')
-            from openpyxl import load_workbook
-            wb = load_workbook(filename)
-            ws = wb.active
-            for col in ws.columns:
-                max_length = 0
-                column = col[0].column_letter
-                for cell in col:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = (max_length + 2)
-                ws.column_dimensions[column].width = adjusted_width
-            wb.save(filename)
-            webbrowser.open(filename)
-            messagebox.showinfo("Успех", f"Файл сохранён:\n{filename}")
+            # Зависимость проверяется до выбора файла; сама запись идёт в фоне
+            import openpyxl
         except ImportError:
             messagebox.showerror("Ошибка", "Установите openpyxl: pip install openpyxl")
-        except Exception as e:
-            messagebox.showerror("Ошибка", f"Не удалось экспортировать:\n{e}")
+            return
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".xlsx",
+            filetypes=[("Excel files", "*.xlsx")],
+            title=filename_title,
+            initialdir=initial_dir
+        )
+        if not filename:
+            return
+        # Строки уже собраны в кортежи — книга пишется в фоновом потоке, окно не замирает
+        self.status_var.set("Экспорт в Excel...")
+        self._run_in_background(_write_excel_report, filename, rows, columns,
+                                on_done=lambda _, error: self._on_excel_exported(filename, error),
+                                executor=self._export_executor)
+
+    def _on_excel_exported(self, filename: str, error: Optional[BaseException]):
+        if error is not None:
+            self.status_var.set("Ошибка при экспорте в Excel")
+            messagebox.showerror("Ошибка", f"Не удалось экспортировать:\n{error}")
+            logger.error(f"Export Excel: {error}")
+            return
+        self.status_var.set("Файл сохранён")
+        webbrowser.open(filename)
+        messagebox.showinfo("Успех", f"Файл сохранён:\n{filename}")
 
     def export_history_to_excel(self):
         if not self.history_data:
@@ -1505,254 +2055,160 @@ class InventoryApp:
             return
         rows = []
         for serial, records in self.history_data.items():
-            eq_type = "-"
-            model = self._get_model_by_serial(serial)
-            for item in self.inventory_data:
-                if item.get('serial_number') == serial:
-                    eq_type = item.get('equipment_type', '-')
-                    break
-            for record in records:
-                rows.append({
-                    "Тип оборудования": eq_type,
-                    "Модель": model,
-                    "Серийный номер": serial,
-                    "Сотрудник": record["assignment"],
-                    "Дата закрепления": record["date"]
-                })
-        self._export_to_excel(rows, "Сохранить историю в Excel", self.data_dir)
+            # Тип и модель — из индекса по серийному номеру, а не проходом по всем записям
+            eq_type, model = self._type_and_model(serial)
+            rows.extend((eq_type, model, serial, record["assignment"], record["date"]) for record in records)
+        self._export_to_excel(rows, ["Тип оборудования", "Модель", "Серийный номер", "Сотрудник", "Дата закрепления"],
+                              "Сохранить историю в Excel", self.data_dir)
 
     def export_filtered_history_to_excel(self):
-        items = self.history_tree.get_children()
-        if not items:
+        tree_rows = _tree_rows(self.history_tree)
+        if not tree_rows:
             messagebox.showwarning("Предупреждение", "Нет данных для экспорта")
             return
-        rows = []
-        for item in items:
-            values = self.history_tree.item(item, 'values')
-            rows.append({
-                "Тип оборудования": values[0],
-                "Модель": values[1],
-                "Серийный номер": values[2],
-                "Сотрудник": values[3],
-                "Дата закрепления": values[4]
-            })
-        self._export_to_excel(rows, "Сохранить отфильтрованную историю в Excel", self.data_dir)
+        self._export_to_excel(tree_rows, ["Тип оборудования", "Модель", "Серийный номер", "Сотрудник", "Дата закрепления"],
+                              "Сохранить отфильтрованную историю в Excel", self.data_dir)
 
     def export_employees_to_excel(self):
         if not self.employees_list:
             messagebox.showwarning("Предупреждение", "Список сотрудников пуст")
             return
-        rows = [{"Сотрудник": emp} for emp in sorted(self.employees_list)]
-        self._export_to_excel(rows, "Сохранить список сотрудников", self.data_dir)
+        rows = [(emp,) for emp in self._sorted_employees()]
+        self._export_to_excel(rows, ["Сотрудник"], "Сохранить список сотрудников", self.data_dir)
 
     def export_search_results_to_excel(self):
-        items = self.search_tree.get_children()
-        if not items:
+        tree_rows = _tree_rows(self.search_tree)
+        if not tree_rows:
             messagebox.showwarning("Предупреждение", "Нет данных для экспорта")
             return
-        rows = []
-        for item in items:
-            values = self.search_tree.item(item, 'values')
-            rows.append({
-                "Тип": values[0],
-                "Модель": values[1],
-                "Серийный номер": values[2],
-                "Закрепление": values[3],
-                "Дата": values[4],
-                "Комментарии": values[5]
-            })
-        self._export_to_excel(rows, "Сохранить результаты поиска в Excel", self.data_dir)
+        self._export_to_excel(tree_rows, ["Тип", "Модель", "Серийный номер", "Закрепление", "Дата", "Комментарии"],
+                              "Сохранить результаты поиска в Excel", self.data_dir)
 
     def export_employee_results_to_excel(self):
-        items = self.employee_tree.get_children()
-        if not items:
+        tree_rows = _tree_rows(self.employee_tree)
+        if not tree_rows:
             messagebox.showwarning("Предупреждение", "Нет данных для экспорта")
             return
-        rows = []
-        for item in items:
-            values = self.employee_tree.item(item, 'values')
-            rows.append({
-                "Тип": values[0],
-                "Модель": values[1],
-                "Серийный номер": values[2],
-                "Дата": values[3],
-                "Комментарии": values[4]
-            })
-        self._export_to_excel(rows, "Сохранить отчёт по сотруднику в Excel", self.data_dir)
+        self._export_to_excel(tree_rows, ["Тип", "Модель", "Серийный номер", "Дата", "Комментарии"],
+                              "Сохранить отчёт по сотруднику в Excel", self.data_dir)
 
     def export_transfers_to_excel(self):
-        items = self.transfers_tree.get_children()
-        if not items:
+        tree_rows = _tree_rows(self.transfers_tree)
+        if not tree_rows:
             messagebox.showwarning("Предупреждение", "Нет данных для экспорта")
             return
-        rows = []
-        for item in items:
-            values = self.transfers_tree.item(item, 'values')
-            rows.append({
-                "Тип": values[0],
-                "Серийный номер": values[1],
-                "От кого": values[2],
-                "Кому": values[3],
-                "Дата передачи": values[4]
-            })
-        self._export_to_excel(rows, "Сохранить отчёт по передачам", self.data_dir)
+        self._export_to_excel(tree_rows, ["Тип", "Серийный номер", "От кого", "Кому", "Дата передачи"],
+                              "Сохранить отчёт по передачам", self.data_dir)
 
     def export_to_excel(self):
         if not self.inventory_data:
             messagebox.showwarning("Предупреждение", "Нет данных для экспорта")
             return
         active_tab = self.notebook.index(self.notebook.select())
-        if active_tab == 0:
-            current_data = []
-            for item in self.all_tree.get_children():
-                values = self.all_tree.item(item, 'values')
-                current_data.append({
-                    'Тип': values[0],
-                    'Модель': values[1],
-                    'Серийный номер': values[2],
-                    'Закрепление': values[3],
-                    'Дата': values[4],
-                    'Комментарии': values[5]
-                })
-            data_to_export = current_data
-        else:
-            data_to_export = [
-                {
-                    'Тип': item.get('equipment_type', ''),
-                    'Модель': item.get('model', ''),
-                    'Серийный номер': item.get('serial_number', ''),
-                    'Закрепление': item.get('assignment', ''),
-                    'Дата': item.get('date', ''),
-                    'Комментарии': item.get('comments', '')
-                }
-                for item in self.inventory_data
-            ]
-        self._export_to_excel(data_to_export, "Сохранить отчет в Excel", self.data_dir)
+        items = self._all_tree_records() if active_tab == 0 else self.inventory_data
+        data_to_export = [
+            (
+                item.get('equipment_type', ''),
+                item.get('model', ''),
+                item.get('serial_number', ''),
+                item.get('assignment', ''),
+                item.get('date', ''),
+                item.get('comments', '')
+            )
+            for item in items
+        ]
+        self._export_to_excel(data_to_export, ['Тип', 'Модель', 'Серийный номер', 'Закрепление', 'Дата', 'Комментарии'],
+                              "Сохранить отчет в Excel", self.data_dir)
 
     # =============== ЭКСПОРТ В PDF (общая функция) ===============
     def _export_to_pdf(self, title: str, columns: List[str], data_rows: List[List[str]], subtitle: str = ""):
-        try:
-            font_path = _get_asset_path('ChakraPetch-Regular.ttf')
-            pdf = PDFWithCyrillic(orientation='L')
-            pdf.set_auto_page_break(auto=True, margin=15)
-            pdf.add_page()
-            pdf.set_font("ChakraPetch", '', 18)
-            pdf.cell(0, 10, title, 0, 1, 'C')
-            if subtitle:
-                pdf.set_font("ChakraPetch", '', 12)
-                pdf.cell(0, 10, subtitle, 0, 1, 'C')
-            pdf.ln(10)
-            pdf.set_font("ChakraPetch", '', 12)
-            col_widths = []
-            for col_index in range(len(columns)):
-                max_width = pdf.get_string_width(columns[col_index]) + 6
-                for row in data_rows:
-                    w = pdf.get_string_width(str(row[col_index])) + 6
-                    if w > max_width:
-                        max_width = w
-                col_widths.append(max_width)
-            pdf.set_font("ChakraPetch", '', 14)
-            for i, col in enumerate(columns):
-                pdf.cell(col_widths[i], 10, col, 1, new_x="RIGHT", new_y="TOP", align='C')
-            pdf.ln()
-            pdf.set_font("ChakraPetch", '', 12)
-            for row in data_rows:
-                for i, cell_text in enumerate(row):
-                    pdf.cell(col_widths[i], 10, str(cell_text), 1, new_x="RIGHT", new_y="TOP")
-                pdf.ln()
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".pdf",
-                filetypes=[("PDF files", "*.pdf")],
-                title="Сохранить отчёт в PDF",
-                initialdir=self.data_dir
-            )
-            if not filename:
-                return
-            pdf.output(filename)
-            webbrowser.open(filename)
-            messagebox.showinfo("Успех", f"Отчёт сохранён:\n{filename}")
-        except Exception as e:
-            messagebox.showerror("Ошибка", f"Не удалось создать PDF отчёт: {e}")
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".pdf",
+            filetypes=[("PDF files", "*.pdf")],
+            title="Сохранить отчёт в PDF",
+            initialdir=self.data_dir
+        )
+        if not filename:
+            return
+        # Строки уже собраны в обычные списки — PDF строится в фоновом потоке, окно не замирает
+        self.status_var.set("Формирование PDF отчёта...")
+        self._run_in_background(_build_pdf_report, filename, title, columns, data_rows, subtitle,
+                                on_done=self._on_pdf_exported, executor=self._export_executor)
+
+    def _on_pdf_exported(self, filenames: Optional[List[str]], error: Optional[BaseException]):
+        if error is not None:
+            self.status_var.set("Ошибка при создании PDF отчёта")
+            messagebox.showerror("Ошибка", f"Не удалось создать PDF отчёт: {error}")
+            logger.error(f"Export PDF: {error}")
+            return
+        self.status_var.set("Отчёт сохранён")
+        webbrowser.open(filenames[0])
+        if len(filenames) == 1:
+            messagebox.showinfo("Успех", f"Отчёт сохранён:\n{filenames[0]}")
+        else:
+            messagebox.showinfo("Успех", f"Отчёт разбит на {len(filenames)} файлов:\n" + "\n".join(filenames))
 
     def export_to_pdf(self):
         if not self.inventory_data:
             messagebox.showwarning("Предупреждение", "Нет данных для экспорта")
             return
         active_tab = self.notebook.index(self.notebook.select())
-        if active_tab == 0:
-            data_rows = []
-            for item in self.all_tree.get_children():
-                values = self.all_tree.item(item, 'values')
-                row = [
-                    values[0] or '-',
-                    values[1] or '-',
-                    values[2] or '-',
-                    values[3] or '-',
-                    values[4] or '-',
-                    (values[5][:50] + '...') if values[5] and len(values[5]) > 50 else (values[5] or '-')
-                ]
-                data_rows.append(row)
-        else:
-            data_rows = []
-            for item in self.inventory_data:
-                row = [
-                    item.get('equipment_type', '') or '-',
-                    item.get('model', '') or '-',
-                    item.get('serial_number', '') or '-',
-                    item.get('assignment', '') or '-',
-                    item.get('date', '') or '-',
-                    (item.get('comments', '')[:50] + '...') if item.get('comments') and len(
-                        item.get('comments')) > 50 else (item.get('comments', '') or '-')
-                ]
-                data_rows.append(row)
+        items = self._all_tree_records() if active_tab == 0 else self.inventory_data
+        data_rows = []
+        for item in items:
+            comments = item.get('comments')
+            row = [
+                item.get('equipment_type', '') or '-',
+                item.get('model', '') or '-',
+                item.get('serial_number', '') or '-',
+                item.get('assignment', '') or '-',
+                item.get('date', '') or '-',
+                _comment_preview(comments) if comments else '-'
+            ]
+            data_rows.append(row)
         total_equipment = len(self.inventory_data)
-        unique_employees = len(
-            set(item.get('assignment', '') for item in self.inventory_data if item.get('assignment')))
+        unique_employees = len(self._assignment_counts)
         subtitle = f"Всего единиц: {total_equipment} | Сотрудников: {unique_employees} | {datetime.now().strftime('%d.%m.%Y %H:%M')}"
         self._export_to_pdf("Полный отчет по инвентаризации оборудования",
                             ["Тип", "Модель", "Серийный номер", "Закрепление", "Дата", "Комментарии"],
                             data_rows, subtitle)
 
     def export_search_results_to_pdf(self):
-        items = self.search_tree.get_children()
-        if not items:
+        data_rows = [list(values) for values in _tree_rows(self.search_tree)]
+        if not data_rows:
             messagebox.showwarning("Предупреждение", "Нет данных для экспорта")
             return
-        data_rows = [list(self.search_tree.item(item, 'values')) for item in items]
         self._export_to_pdf("Отчет по результатам поиска оборудования",
                             ["Тип", "Модель", "Серийный номер", "Закрепление", "Дата", "Комментарии"],
                             data_rows)
 
     def export_employee_results_to_pdf(self):
-        items = self.employee_tree.get_children()
-        if not items:
+        data_rows = [list(values) for values in _tree_rows(self.employee_tree)]
+        if not data_rows:
             messagebox.showwarning("Предупреждение", "Нет данных для экспорта")
             return
         employee_name = self.employee_var.get()
-        data_rows = [list(self.employee_tree.item(item, 'values')) for item in items]
         self._export_to_pdf(f"Отчет по оборудованию сотрудника: {employee_name}",
                             ["Тип", "Модель", "Серийный номер", "Дата", "Комментарии"],
                             data_rows)
 
     def export_filtered_history_to_pdf(self):
-        items = self.history_tree.get_children()
-        if not items:
+        data_rows = [list(values) for values in _tree_rows(self.history_tree)]
+        if not data_rows:
             messagebox.showwarning("Предупреждение", "Нет данных для экспорта")
             return
-        data_rows = [list(self.history_tree.item(item, 'values')) for item in items]
         self._export_to_pdf("Отчет по истории (по фильтру)",
                             ["Тип оборудования", "Модель", "Серийный номер", "Сотрудник", "Дата закрепления"],
                             data_rows)
 
     def export_transfers_to_pdf(self):
-        items = self.transfers_tree.get_children()
-        if not items:
+        data_rows = [list(values) for values in _tree_rows(self.transfers_tree)]
+        if not data_rows:
             messagebox.showwarning("Предупреждение", "Нет данных для экспорта")
             return
         start = self.transfers_start_var.get()
         end = self.transfers_end_var.get()
         subtitle = f"Период: с {start} по {end}"
-        data_rows = [list(self.transfers_tree.item(item, 'values')) for item in items]
         self._export_to_pdf("Отчёт по передачам оборудования",
                             ["Тип", "Серийный номер", "От кого", "Кому", "Дата передачи"],
                             data_rows, subtitle)
@@ -1788,14 +2244,15 @@ class InventoryApp:
         ttk.Label(control_frame, text="Дата начала (дд.мм.гггг):", font=self.default_font).grid(row=0, column=0,
                                                                                                 sticky='w',
                                                                                                 padx=(0, 10))
-        self.transfers_start_var = tk.StringVar(value=datetime.now().strftime("%d.%m.%Y"))
+        today = datetime.now().strftime("%d.%m.%Y")
+        self.transfers_start_var = tk.StringVar(value=today)
         start_entry = ttk.Entry(control_frame, textvariable=self.transfers_start_var, width=12, font=self.default_font)
         start_entry.grid(row=0, column=1, padx=(0, 20))
 
         ttk.Label(control_frame, text="Дата окончания (дд.мм.гггг):", font=self.default_font).grid(row=0, column=2,
                                                                                                    sticky='w',
                                                                                                    padx=(0, 10))
-        self.transfers_end_var = tk.StringVar(value=datetime.now().strftime("%d.%m.%Y"))
+        self.transfers_end_var = tk.StringVar(value=today)
         end_entry = ttk.Entry(control_frame, textvariable=self.transfers_end_var, width=12, font=self.default_font)
         end_entry.grid(row=0, column=3, padx=(0, 20))
 
@@ -1837,23 +2294,22 @@ class InventoryApp:
             messagebox.showerror("Ошибка", "Неверный формат даты. Используйте дд.мм.гггг")
             return
 
-        for item in self.transfers_tree.get_children():
-            self.transfers_tree.delete(item)
+        _clear_tree(self.transfers_tree)
 
         transfers = []
         for item in self.inventory_data:
             serial = item.get('serial_number')
             if not serial:
                 continue
-            # Собираем полную историю: начальное закрепление + history
+            # Собираем полную историю: начальное закрепление + history.
+            # Дата разбирается один раз: (datetime, сотрудник, строка даты)
             full_history = []
             # Добавляем первоначальное закрепление из inventory.json
             first_assignment = item.get('assignment')
             first_date = item.get('date')
             if first_assignment and first_date:
                 try:
-                    datetime.strptime(first_date, "%d.%m.%Y")
-                    full_history.append({"assignment": first_assignment, "date": first_date})
+                    full_history.append((datetime.strptime(first_date, "%d.%m.%Y"), first_assignment, first_date))
                 except ValueError:
                     pass  # некорректная дата — пропускаем
             # Добавляем записи из history.json
@@ -1861,74 +2317,64 @@ class InventoryApp:
             for rec in history_records:
                 if rec.get("assignment") and rec.get("date"):
                     try:
-                        datetime.strptime(rec["date"], "%d.%m.%Y")
-                        full_history.append(rec)
+                        full_history.append((datetime.strptime(rec["date"], "%d.%m.%Y"), rec["assignment"], rec["date"]))
                     except ValueError:
                         continue
             # Убираем дубликаты и сортируем по дате
             seen = set()
             unique_history = []
             for rec in full_history:
-                key = (rec["assignment"], rec["date"])
+                key = (rec[1], rec[2])
                 if key not in seen:
                     seen.add(key)
                     unique_history.append(rec)
             if len(unique_history) < 2:
                 continue
-            sorted_history = sorted(
-                unique_history,
-                key=lambda x: datetime.strptime(x["date"], "%d.%m.%Y")
-            )
+            sorted_history = sorted(unique_history, key=itemgetter(0))
+            # Передачи вне периода пропускаем сразу: ищем границы бинарным поиском
+            dts = [rec[0] for rec in sorted_history]
+            lo = bisect_left(dts, start_dt)
+            hi = bisect_right(dts, end_dt)
             # Формируем передачи: от предыдущего к текущему
-            for i in range(1, len(sorted_history)):
-                prev_emp = sorted_history[i - 1]["assignment"]
-                curr_emp = sorted_history[i]["assignment"]
-                transfer_date_str = sorted_history[i]["date"]
+            for i in range(max(1, lo), hi):
+                prev_emp = sorted_history[i - 1][1]
+                curr_emp = sorted_history[i][1]
                 if prev_emp == curr_emp:
                     continue
-                try:
-                    transfer_date = datetime.strptime(transfer_date_str, "%d.%m.%Y")
-                except ValueError:
-                    continue
-                if start_dt <= transfer_date <= end_dt:
-                    eq_type = item.get("equipment_type", "-")
-                    transfers.append({
-                        "equipment_type": eq_type,
-                        "serial": serial,
-                        "from": prev_emp,
-                        "to": curr_emp,
-                        "date": transfer_date_str
-                    })
+                eq_type = item.get("equipment_type", "-")
+                transfers.append({
+                    "equipment_type": eq_type,
+                    "serial": serial,
+                    "from": prev_emp,
+                    "to": curr_emp,
+                    "date": sorted_history[i][2],
+                    "_dt": sorted_history[i][0]
+                })
 
         if not transfers:
             messagebox.showinfo("Информация", "В указанный период передач оборудования не найдено.")
             return
 
         # Сортируем по дате передачи
-        transfers.sort(key=lambda x: datetime.strptime(x["date"], "%d.%m.%Y"))
-        for tr in transfers:
-            self.transfers_tree.insert("", "end", values=(
-                tr["equipment_type"],
-                tr["serial"],
-                tr["from"],
-                tr["to"],
-                tr["date"]
-            ))
+        transfers.sort(key=itemgetter("_dt"))
+        _insert_rows(self.transfers_tree,
+                     [(tr["equipment_type"], tr["serial"], tr["from"], tr["to"], tr["date"]) for tr in transfers])
 
     def treeview_sort_column(self, tree, col, reverse):
+        if tree is self.all_tree:
+            self._finish_all_tree_fill()
+            self._all_tree_version = None  # порядок строк изменён — обновление вернёт сортировку по закреплению
         date_columns = ['Дата']
         def sort_key(val):
             if col in date_columns:
-                try:
-                    return datetime.strptime(val, "%d.%m.%Y")
-                except:
-                    return datetime.min
+                return _date_sort_key(val)
             else:
                 return val.lower() if isinstance(val, str) else val
-        data = [(tree.set(k, col), k) for k in tree.get_children('')]
-        data.sort(key=lambda t: sort_key(t[0]), reverse=reverse)
-        for index, (_, k) in enumerate(data):
-            tree.move(k, '', index)
+        # Ключи вычисляются один раз на строку, затем сортируются готовые значения
+        data = [(sort_key(value), k) for value, k in _tree_column_values(tree, col)]
+        data.sort(key=itemgetter(0), reverse=reverse)
+        # Новый порядок задаётся одним вызовом вместо move() на каждую строку
+        tree.set_children('', *(k for _, k in data))
         tree.heading(col, command=lambda: self.treeview_sort_column(tree, col, not reverse))
 
     def show_context_menu(self, event):
@@ -1954,22 +2400,46 @@ class InventoryApp:
             return
         if not messagebox.askyesno("Подтверждение", "Вы уверены, что хотите удалить выбранную запись?"):
             return
+        self._finish_all_tree_fill()
+        removed = {}  # id(запись) -> запись: удаляются ровно выбранные записи, даже при повторе серийного номера
+        deleted_rows = []
         for item in selected_items:
-            values = tree.item(item, 'values')
-            serial_number = values[2] if len(values) > 2 else None
-            if not serial_number:
+            record = self._row_record(tree, item)
+            if record is None or id(record) in removed:
                 continue
-            for i, inv_item in enumerate(self.inventory_data):
-                if inv_item.get('serial_number') == serial_number:
-                    del self.inventory_data[i]
-                    tree.delete(item)
-                    break
-        if self.save_data():
-            messagebox.showinfo("Успех", "Запись успешно удалена")
-            self.refresh_employee_list()
-            self.show_all_data()
-            self.update_history_combobox()
-            self.update_serial_combobox()
+            removed[id(record)] = record
+            self._count_assignment(record.get('assignment', ''), -1)
+            deleted_rows.append(item)
+        if not removed:
+            return
+        tree.delete(*deleted_rows)
+        # Строки с удалёнными записями убираются и из других таблиц, чтобы их нельзя было править
+        for other in (self.all_tree, self.search_tree, self.employee_tree):
+            items = self._tree_items(other)
+            stale = [k for k, record in items.items() if id(record) in removed]
+            for k in stale:
+                del items[k]
+            if other is not tree and stale:
+                other.delete(*stale)
+        # Один проход по списку вместо поиска каждой удаляемой записи
+        serials = set()
+        for record in removed.values():
+            serial_number = record.get('serial_number')
+            if self._by_serial.get(serial_number) is record:
+                del self._by_serial[serial_number]
+                serials.add(serial_number)
+        kept = []
+        for item in self.inventory_data:
+            if id(item) in removed:
+                continue
+            kept.append(item)
+            # Оставшаяся запись с тем же серийным номером снова доступна по индексу
+            if item.get('serial_number') in serials:
+                self._by_serial.setdefault(item['serial_number'], item)
+        self.inventory_data = kept
+        self._invalidate_search_index()
+        if self.save_data(on_saved=lambda: messagebox.showinfo("Успех", "Запись успешно удалена")):
+            self._schedule_refresh('all')
 
     def add_equipment(self):
         equipment_data = {}
@@ -1991,59 +2461,66 @@ class InventoryApp:
             messagebox.showerror("Ошибка", f"Серийный номер '{equipment_data['serial_number']}' уже существует!")
             return
 
-        equipment_data['created_datetime'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        now = datetime.now()
+        equipment_data['created_datetime'] = now.strftime("%Y-%m-%d %H:%M:%S")
         self.inventory_data.append(equipment_data)
+        self._index_new_item(equipment_data)
         self.add_to_history(equipment_data['serial_number'], equipment_data['assignment'], equipment_data['date'])
-        if self.save_data():
-            messagebox.showinfo("Успех", "Оборудование успешно добавлено!")
-            self.clear_entries()
-            self.refresh_employee_list()
-            self.show_all_data()
-            self.update_history_combobox()
-            self.update_serial_combobox()
+        if self.save_data(on_saved=lambda: messagebox.showinfo("Успех", "Оборудование успешно добавлено!")):
+            self.clear_entries(now.strftime("%d.%m.%Y"))
+            self._schedule_refresh('all')
 
-    def clear_entries(self):
+    def clear_entries(self, today: Optional[str] = None):
         for field_name, entry in self.entries.items():
             if field_name == "comments":
                 entry.delete("1.0", tk.END)
             elif field_name == "date":
                 entry.delete(0, tk.END)
-                entry.insert(0, datetime.now().strftime("%d.%m.%Y"))
+                entry.insert(0, today or datetime.now().strftime("%d.%m.%Y"))
             else:
                 entry.delete(0, tk.END)
         if 'equipment_type' in self.entries:
             self.entries['equipment_type'].set('')
 
     def perform_search(self, event=None):
-        search_text = self.search_entry.get().lower().strip()
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+        self._search_job = self.root.after(self.search_delay, self._perform_search_now)
+
+    def _perform_search_now(self):
+        self._search_job = None
+        search_text = _search_fold(self.search_entry.get().strip())
         selected_employee = self.search_employee_var.get().strip()
-        for item in self.search_tree.get_children():
-            self.search_tree.delete(item)
+        _clear_tree(self.search_tree)
+        self._search_tree_items = {}
         if not search_text and not selected_employee:
             return
-        for item in self.inventory_data:
-            matches_search = any(search_text in str(value).lower() for value in item.values() if value)
-            matches_employee = (not selected_employee) or (item.get('assignment', '') == selected_employee)
-            if matches_search and matches_employee:
-                self.search_tree.insert("", "end", values=(
-                    item.get('equipment_type', ''),
-                    item.get('model', ''),
-                    item.get('serial_number', ''),
-                    item.get('assignment', ''),
-                    item.get('date', ''),
-                    (item.get('comments', '')[:50] + '...') if item.get('comments') and len(
-                        item.get('comments')) > 50 else item.get('comments', '')
-                ))
+        # Несколько слов в запросе ищутся независимо: запись подходит, если содержит каждое
+        tokens = search_text.split()
+        # Строки для поиска собираются один раз и переиспользуются до изменения данных
+        rows = self._get_search_blobs() if tokens else [(None, item) for item in self.inventory_data]
+        # Отбор идёт последовательным сужением простыми фильтрами (сначала дешёвый — по сотруднику):
+        # по одному условию на проход это в несколько раз быстрее общего all() по каждой строке
+        if selected_employee:
+            rows = [row for row in rows if row[1].get('assignment', '') == selected_employee]
+        for token in tokens:
+            rows = [row for row in rows if token in row[0]]
+        # Сначала подготовка всех строк в Python, затем вставка одной серией
+        items = [item for _, item in rows]
+        self._search_tree_items = dict(zip(_insert_rows(self.search_tree, [_inventory_row(item) for item in items]),
+                                           items))
 
     def clear_search(self):
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+            self._search_job = None
         self.search_entry.delete(0, tk.END)
         self.search_employee_var.set('')
-        for item in self.search_tree.get_children():
-            self.search_tree.delete(item)
+        _clear_tree(self.search_tree)
+        self._search_tree_items = {}
 
     def update_history_combobox(self):
-        serials = sorted(
-            set(item.get('serial_number', '') for item in self.inventory_data if item.get('serial_number')))
+        serials = self._sorted_serials()
         self.history_serial_combo['values'] = serials
         if serials:
             self.history_serial_combo_var.set(serials[0])
@@ -2052,175 +2529,304 @@ class InventoryApp:
 
     def show_employee_equipment(self, event=None):
         employee = self.employee_var.get()
-        for item in self.employee_tree.get_children():
-            self.employee_tree.delete(item)
+        _clear_tree(self.employee_tree)
+        self._employee_tree_items = {}
         if not employee:
             return
-        for item in self.inventory_data:
-            if item.get('assignment') == employee:
-                self.employee_tree.insert("", "end", values=(
-                    item.get('equipment_type', ''),
-                    item.get('model', ''),
-                    item.get('serial_number', ''),
-                    item.get('date', ''),
-                    (item.get('comments', '')[:50] + '...') if item.get('comments') and len(
-                        item.get('comments')) > 50 else item.get('comments', '')
-                ))
+        items = self._items_by_assignment().get(employee, ())
+        self._employee_tree_items = dict(zip(_insert_rows(self.employee_tree, [_employee_row(item) for item in items]),
+                                             items))
+
+    def reload_data(self):
+        """Перечитывает inventory.json с диска (по кнопке «Обновить данные»)."""
+        if self.unsaved_changes and not messagebox.askyesno(
+                "Несохранённые изменения",
+                "Есть несохранённые изменения. Перезагрузить данные из файла и отменить их?"):
+            return
+        discard = self.unsaved_changes
+        if discard:
+            # Правки отменены — отложенные записи по ним больше не нужны. История записей,
+            # уже ушедших в inventory.json, записана вместе с ними в save_data
+            if self._save_job is not None:
+                self.root.after_cancel(self._save_job)
+                self._save_job = None
+            if self._history_save_job is not None:
+                self.root.after_cancel(self._history_save_job)
+                self._history_save_job = None
+        if not self._flush_saves():
+            return
+        if discard:
+            # История в памяти содержит записи об отменённых правках — берём её с диска
+            self.history_data = self.load_history()
+            self._history_seen = None
+            self.show_full_history()
+        # Файл не менялся с последней загрузки/сохранения — перечитывать его по сети незачем
+        if discard or self._loaded_mtime is None or self._inventory_mtime() != self._loaded_mtime:
+            self.inventory_data = self.load_data()
+            self._rebuild_indexes()
+            self.mark_saved()
+        self.show_all_data()
+
+    def _schedule_refresh(self, *parts: str):
+        """Обновляет представления при простое цикла событий; запросы нескольких изменений подряд объединяются."""
+        self._refresh_pending.update(parts)
+        if self._refresh_job is None:
+            self._refresh_job = self.root.after_idle(self._do_refresh)
+
+    def _do_refresh(self):
+        self._refresh_job = None
+        parts, self._refresh_pending = self._refresh_pending, set()
+        if 'all' in parts:
+            # show_all_data сам обновляет список сотрудников и списки серийных номеров истории
+            self.show_all_data()
+            return
+        if 'employees' in parts:
+            self.refresh_employee_list()
+        if 'history' in parts:
+            self.update_history_combobox()
+            self.update_serial_combobox()
 
     def show_all_data(self):
-        for item in self.all_tree.get_children():
-            self.all_tree.delete(item)
-        self.inventory_data = self.load_data()
-        for item in self.inventory_data:
-            self.all_tree.insert("", "end", values=(
-                item.get('equipment_type', ''),
-                item.get('model', ''),
-                item.get('serial_number', ''),
-                item.get('assignment', ''),
-                item.get('date', ''),
-                (item.get('comments', '')[:50] + '...') if item.get('comments') and len(
-                    item.get('comments')) > 50 else item.get('comments', '')
-            ))
+        # Записи не менялись с последнего заполнения (например, «Обновить данные» без изменений
+        # в файле) — таблица уже актуальна, очищать и заполнять её заново незачем
+        if self._all_tree_version != self._data_version:
+            self._cancel_all_tree_fill()
+            _clear_tree(self.all_tree)
+            self._all_tree_items = {}
+            # Сортировка по «Закреплению» делается в Python до вставки, а не перестановкой строк дерева
+            self._fill_rows = sorted(self.inventory_data, key=lambda item: (item.get('assignment') or '').lower())
+            self._fill_pos = 0
+            self._fill_all_tree_chunk(self.tree_fill_chunk)
+            self._all_tree_version = self._data_version
+        self.all_tree.heading("Закрепление",
+                              command=lambda: self.treeview_sort_column(self.all_tree, "Закрепление", True))
         self.refresh_employee_list()
         self.update_history_combobox()
         self.update_serial_combobox()
-        self.treeview_sort_column(self.all_tree, "Закрепление", False)
+
+    def _fill_all_tree_chunk(self, limit: Optional[int] = None):
+        """Вставляет очередную порцию строк в «Показать всё»; остальные — в следующих проходах цикла событий."""
+        self._fill_job = None
+        rows = self._fill_rows
+        start = self._fill_pos
+        end = len(rows) if limit is None else min(start + limit, len(rows))
+        chunk = rows[start:end]
+        self._all_tree_items.update(zip(_insert_rows(self.all_tree, [_inventory_row(item) for item in chunk]), chunk))
+        self._fill_pos = end
+        if end < len(rows):
+            self._fill_job = self.root.after(1, self._fill_all_tree_chunk, self.tree_fill_chunk)
+        else:
+            self._fill_rows = []
+
+    def _all_tree_records(self) -> List[Dict[str, Any]]:
+        """Записи вкладки «Показать всё» в текущем порядке строк (с учётом сортировки по столбцу)."""
+        self._finish_all_tree_fill()
+        items = self._all_tree_items
+        # Одно обращение к Tcl за порядком строк; значения берутся из самих записей, а не из ячеек таблицы
+        return [items[k] for k in self.all_tree.get_children() if k in items]
+
+    def _cancel_all_tree_fill(self):
+        if self._fill_job is not None:
+            self.root.after_cancel(self._fill_job)
+            self._fill_job = None
+        self._fill_rows = []
+        self._fill_pos = 0
+
+    def _finish_all_tree_fill(self):
+        """Досыпает оставшиеся строки сразу — перед сортировкой, экспортом или удалением."""
+        if self._fill_job is not None:
+            self.root.after_cancel(self._fill_job)
+            self._fill_all_tree_chunk()
 
     def on_tree_double_click(self, event):
         tree = event.widget
         item = tree.identify('item', event.x, event.y)
         column = tree.identify_column(event.x)
-        if not item or item not in tree.get_children():
+        if not item or not tree.exists(item):
+            return
+        if tree is self.employee_tree:
+            field_names = _EMPLOYEE_TREE_FIELDS
+        elif tree is self.all_tree or tree is self.search_tree:
+            field_names = _INVENTORY_TREE_FIELDS
+        else:
             return
         col_index = int(column.replace('#', '')) - 1
+        if not 0 <= col_index < len(field_names):
+            return
+        field_name = field_names[col_index]
         current_values = tree.item(item, 'values')
         current_value = current_values[col_index]
-        field_names_map = {
-            self.employee_tree: {0: 'equipment_type', 1: 'model', 2: 'serial_number', 3: 'date', 4: 'comments'},
-            self.all_tree: {0: 'equipment_type', 1: 'model', 2: 'serial_number', 3: 'assignment', 4: 'date',
-                            5: 'comments'},
-            self.search_tree: {0: 'equipment_type', 1: 'model', 2: 'serial_number', 3: 'assignment', 4: 'date',
-                               5: 'comments'}
-        }
-        field_names = field_names_map.get(tree)
-        if not field_names:
-            return
-        field_name = field_names.get(col_index)
-        if not field_name:
-            return
-        idx = next(
-            (i for i, inv_item in enumerate(self.inventory_data) if inv_item.get('serial_number') == current_values[2]),
-            None)
-        if idx is None:
-            return
-        self.edit_cell(tree, item, col_index, field_name, current_value, idx)
-
-    def edit_cell(self, tree, item, col_index, field_name, current_value, data_index):
+        record = self._row_record(tree, item, current_values)
+        if record is None:
+            return
+        self.edit_cell(tree, item, col_index, field_name, current_value, record)
+
+    def _tree_items(self, tree) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Соответствие id строк таблицы записям inventory_data (None — для таблиц без него)."""
+        if tree is self.all_tree:
+            return self._all_tree_items
+        if tree is self.search_tree:
+            return self._search_tree_items
+        if tree is self.employee_tree:
+            return self._employee_tree_items
+        return None
+
+    def _row_record(self, tree, item, values: Optional[tuple] = None) -> Optional[Dict[str, Any]]:
+        """Запись inventory_data, показанная в строке таблицы: по id строки, иначе — первая с её серийным номером."""
+        items = self._tree_items(tree)
+        if items is not None and item in items:
+            return items[item]
+        if values is None:
+            values = tree.item(item, 'values')
+        return self._by_serial.get(values[2]) if len(values) > 2 and values[2] else None
+
+    def edit_cell(self, tree, item, col_index, field_name, current_value, record):
         bbox = tree.bbox(item, column=f'#{col_index + 1}')
         if not bbox:
             return
 
+        committing = False
+
         def validate_and_save(new_value: str):
-            if field_name == 'date':
-                try:
-                    datetime.strptime(new_value, "%d.%m.%Y")
-                except ValueError:
-                    messagebox.showerror("Ошибка", "Неверный формат даты. Используйте дд.мм.гггг")
-                    return False
-            elif field_name == 'serial_number':
-                if not self.is_serial_number_unique(new_value, exclude_index=data_index):
-                    messagebox.showerror("Ошибка", f"Серийный номер '{new_value}' уже существует!")
-                    return False
-            return True
+            nonlocal committing
+            # Окно ошибки забирает фокус, и <FocusOut> редактора вызвал бы сохранение повторно —
+            # пока идёт проверка, вложенные попытки сохранить игнорируются
+            if committing:
+                return False
+            committing = True
+            try:
+                if field_name == 'date':
+                    try:
+                        datetime.strptime(new_value, "%d.%m.%Y")
+                    except ValueError:
+                        messagebox.showerror("Ошибка", "Неверный формат даты. Используйте дд.мм.гггг")
+                        return False
+                elif field_name == 'serial_number':
+                    if not self.is_serial_number_unique(new_value, exclude_item=record):
+                        messagebox.showerror("Ошибка", f"Серийный номер '{new_value}' уже существует!")
+                        return False
+                return True
+            finally:
+                committing = False
+
+        active = True
+
+        def close_editor(editor):
+            nonlocal active
+            active = False
+            # Скрытый редактор продолжал бы получать ввод с клавиатуры — фокус возвращается таблице
+            # (если пользователь не перевёл его в другое поле)
+            has_focus = str(editor.tk.call('focus')) in (str(editor), '')
+            editor.place_forget()
+            if has_focus:
+                tree.focus_set()
 
         if field_name == 'comments':
-            text_edit = scrolledtext.ScrolledText(tree, width=40, height=4, font=self.default_font)
+            text_edit = self._get_cell_editor('text')
+            text_edit.delete('1.0', tk.END)
             text_edit.insert('1.0', current_value)
-            text_edit.place(x=bbox[0], y=bbox[1], width=bbox[2], height=bbox[3] * 3)
+            text_edit.place(in_=tree, x=bbox[0], y=bbox[1], width=bbox[2], height=bbox[3] * 3)
             text_edit.focus()
-            self.bind_clipboard_events(text_edit)
 
             def save_edit(event=None):
+                if not active:
+                    return
                 new_value = text_edit.get('1.0', tk.END).strip()
                 if validate_and_save(new_value):
-                    text_edit.destroy()
+                    close_editor(text_edit)
                     current_values = list(tree.item(item, 'values'))
                     current_values[col_index] = new_value
                     tree.item(item, values=current_values)
-                    self.inventory_data[data_index][field_name] = new_value
-                    self.unsaved_changes = True
-                    self.update_window_title()
-                    self.save_data()
+                    record[field_name] = new_value
+                    self._invalidate_search_index()
+                    self._schedule_save()
 
             def cancel_edit(event=None):
-                text_edit.destroy()
+                close_editor(text_edit)
 
-            text_edit.bind('<Return>', save_edit)
-            text_edit.bind('<Escape>', cancel_edit)
-            text_edit.bind('<FocusOut>', lambda e: save_edit())
+            self._edit_handlers['text'] = (save_edit, cancel_edit)
 
         elif field_name == 'assignment':
-            combo_edit = ttk.Combobox(
-                tree,
-                values=[""] + sorted(self.employees_list),
-                width=bbox[2] // 8,
-                font=self.default_font,
-                state='readonly'
-            )
+            combo_edit = self._get_cell_editor('combo')
+            combo_edit['values'] = self._employee_choices()
             combo_edit.set(current_value)
-            combo_edit.place(x=bbox[0], y=bbox[1], width=bbox[2], height=bbox[3])
+            combo_edit.place(in_=tree, x=bbox[0], y=bbox[1], width=bbox[2], height=bbox[3])
             combo_edit.focus()
 
             def save_edit(event=None):
+                if not active:
+                    return
                 new_value = combo_edit.get().strip()
                 if validate_and_save(new_value):
-                    combo_edit.destroy()
+                    close_editor(combo_edit)
                     current_values = list(tree.item(item, 'values'))
                     current_values[col_index] = new_value
                     tree.item(item, values=current_values)
                     old_value = current_value
-                    self.inventory_data[data_index][field_name] = new_value
-                    serial_number = self.inventory_data[data_index].get('serial_number', '')
+                    self._count_assignment(record.get(field_name, ''), -1)
+                    self._count_assignment(new_value, 1)
+                    record[field_name] = new_value
+                    self._invalidate_search_index()
+                    serial_number = record.get('serial_number', '')
                     if serial_number and old_value != new_value:
                         current_date = datetime.now().strftime("%d.%m.%Y")
                         self.add_to_history(serial_number, new_value, current_date)
-                    self.unsaved_changes = True
-                    self.update_window_title()
-                    self.save_data()
+                    self._schedule_save()
 
             def cancel_edit(event=None):
-                combo_edit.destroy()
+                close_editor(combo_edit)
 
-            combo_edit.bind('<Return>', save_edit)
-            combo_edit.bind('<Escape>', cancel_edit)
-            combo_edit.bind('<FocusOut>', lambda e: save_edit())
-            combo_edit.bind('<<ComboboxSelected>>', lambda e: save_edit())
+            self._edit_handlers['combo'] = (save_edit, cancel_edit)
 
         else:
-            entry_edit = ttk.Entry(tree, width=bbox[2] // 8, font=self.default_font)
+            entry_edit = self._get_cell_editor('entry')
+            entry_edit.delete(0, tk.END)
             entry_edit.insert(0, current_value)
-            entry_edit.place(x=bbox[0], y=bbox[1], width=bbox[2], height=bbox[3])
+            entry_edit.place(in_=tree, x=bbox[0], y=bbox[1], width=bbox[2], height=bbox[3])
             entry_edit.focus()
-            self.bind_clipboard_events(entry_edit)
 
             def save_edit(event=None):
+                if not active:
+                    return
                 new_value = entry_edit.get().strip()
                 if validate_and_save(new_value):
-                    entry_edit.destroy()
+                    close_editor(entry_edit)
                     current_values = list(tree.item(item, 'values'))
                     current_values[col_index] = new_value
                     tree.item(item, values=current_values)
-                    self.inventory_data[data_index][field_name] = new_value
-                    self.unsaved_changes = True
-                    self.update_window_title()
-                    self.save_data()
+                    old_value = record.get(field_name, '')
+                    record[field_name] = new_value
+                    self._invalidate_search_index()
+                    if field_name == 'serial_number' and old_value != new_value:
+                        self._reindex_serial(record, old_value)
+                    self._schedule_save()
 
             def cancel_edit(event=None):
-                entry_edit.destroy()
-
-            entry_edit.bind('<Return>', save_edit)
-            entry_edit.bind('<Escape>', cancel_edit)
-            entry_edit.bind('<FocusOut>', lambda e: save_edit())
+                close_editor(entry_edit)
+
+            self._edit_handlers['entry'] = (save_edit, cancel_edit)
+
+    def _get_cell_editor(self, kind: str):
+        """Возвращает переиспользуемый виджет для редактирования ячейки (создаётся один раз)."""
+        editor = self._edit_pool.get(kind)
+        if editor is None:
+            if kind == 'text':
+                editor = scrolledtext.ScrolledText(self.root, width=40, height=4, font=self.default_font)
+            elif kind == 'combo':
+                editor = ttk.Combobox(self.root, font=self.default_font, state='readonly')
+            else:
+                editor = ttk.Entry(self.root, font=self.default_font)
+            # Привязки создаются один раз и вызывают обработчики текущего редактирования:
+            # повторный bind на каждую правку плодил бы новые Tcl-команды
+            save = lambda event=None: self._edit_handlers[kind][0](event)
+            cancel = lambda event=None: self._edit_handlers[kind][1](event)
+            editor.bind('<Return>', save)
+            editor.bind('<Escape>', cancel)
+            editor.bind('<FocusOut>', save)
+            if kind == 'combo':
+                editor.bind('<<ComboboxSelected>>', save)
+            self._edit_pool[kind] = editor
+        return editor
 
     def show_equipment_graph(self):
         if not self.inventory_data:
@@ -2229,11 +2835,9 @@ class InventoryApp:
         try:
             import matplotlib.pyplot as plt
             from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-            type_counts = {}
-            for item in self.inventory_data:
-                eq_type = item.get('equipment_type', 'Не указано')
-                type_counts[eq_type] = type_counts.get(eq_type, 0) + 1
-            sorted_types = sorted(type_counts.items(), key=lambda x: x[1], reverse=True)
+            # Подсчёт по типам берётся из кэша (пересчитывается только после изменения записей)
+            sorted_types = [('Не указано' if eq_type is None else eq_type, count)
+                            for eq_type, count in self._equipment_type_counts().most_common()]
             types, counts = zip(*sorted_types) if sorted_types else ([], [])
             graph_window = tk.Toplevel(self.root)
             graph_window.title("График распределения оборудования")
@@ -2259,7 +2863,11 @@ class InventoryApp:
 
     def schedule_auto_save(self):
         def auto_save():
-            if self.save_data():
+            self._flush_history_save()
+            self._flush_scheduled_save()
+            # Записи не менялись с последнего сохранения — перезаписывать файл на сетевом диске незачем
+            if ((self.unsaved_changes or self._data_version != self._saved_version)
+                    and not self._inventory_save_pending() and self.save_data()):
                 logger.info("[AUTO-SAVE] Данные сохранены")
             self.root.after(self.auto_save_interval, auto_save)
         self.root.after(self.auto_save_interval, auto_save)